@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import glob
+import argparse
+
+# Epic Color Palette 🎨
+class Colors:
+    PRIMARY = '\033[96m'    # Soft Cyan
+    SUCCESS = '\033[92m'    # Soft Green
+    WARNING = '\033[93m'    # Soft Yellow
+    ERROR = '\033[91m'      # Soft Red
+    DEVICE = '\033[95m'     # Soft Magenta
+    PORT = '\033[94m'       # Soft Blue
+    DIM = '\033[90m'        # Gray
+    BOLD = '\033[1m'        # Bold
+    RESET = '\033[0m'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_DIR = os.path.join(SCRIPT_DIR, "journal")
+
+def journal_files(current):
+    """A device's journal files, oldest first: device.jsonl.3, .2, .1, then device.jsonl"""
+    rotated = []
+    for path in glob.glob(glob.escape(current) + ".*"):
+        suffix = path.rsplit(".", 1)[1]
+        if suffix.isdigit():
+            rotated.append((int(suffix), path))
+    return [path for _, path in sorted(rotated, reverse=True)] + [current]
+
+def read_events(paths, since=0):
+    """Yield journal entries one at a time, so a long history never sits in memory"""
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash or a full disk
+                        continue
+                    if entry.get("t", 0) >= since:
+                        yield entry
+        except OSError:
+            continue
+
+class DeviceStats:
+    """Running totals for one device, fed one journal entry at a time"""
+
+    def __init__(self, name):
+        self.name = name
+        self.first_seen = None
+        self.last_seen = None
+        self.mirroring_seconds = 0.0
+        self.sessions = 0
+        self.in_session = False
+        self.session_started = None
+        self.outage_started = None
+        self.reconnect_seconds = []
+        self.paths = {}
+        self.stalls = 0
+        self.throttles = 0
+        self.scrcpy_errors = 0
+
+    def path_stats(self, path):
+        return self.paths.setdefault(path, {'attempts': 0, 'failed': 0, 'sessions': 0, 'dropped': 0})
+
+    def feed(self, entry):
+        now = entry.get("t", 0)
+        if self.first_seen is None:
+            self.first_seen = now
+        self.last_seen = now
+        event = entry.get("event")
+
+        if event == "attempt":
+            stats = self.path_stats(entry.get("path", "?"))
+            stats['attempts'] += 1
+            if not entry.get("ok"):
+                stats['failed'] += 1
+        elif event == "session_start":
+            self.sessions += 1
+            self.in_session = True
+            self.session_started = now
+            self.path_stats(entry.get("path", "?"))['sessions'] += 1
+            if self.outage_started is not None:
+                self.reconnect_seconds.append(now - self.outage_started)
+                self.outage_started = None
+        elif event == "session_end":
+            # Rotation or --since can cut a session's start off; only count whole sessions
+            if not self.in_session:
+                return
+            self.in_session = False
+            self.mirroring_seconds += entry.get("seconds", 0)
+            if entry.get("stall"):
+                self.stalls += 1
+            # Planned ends (path upgrade, config reload, shutdown) are not outages
+            if entry.get("reason") == "lost":
+                self.path_stats(entry.get("path", "?"))['dropped'] += 1
+                self.outage_started = now
+        elif event == "throttle" and entry.get("step") == "down":
+            self.throttles += 1
+        elif event == "scrcpy" and entry.get("level") == "error":
+            self.scrcpy_errors += 1
+
+    @property
+    def availability(self):
+        span = (self.last_seen or 0) - (self.first_seen or 0)
+        mirroring = self.mirroring_seconds
+        if self.in_session:
+            # Still mirroring when the journal ends
+            mirroring += self.last_seen - self.session_started
+        return min(mirroring / span, 1.0) if span > 0 else None
+
+    @property
+    def mean_reconnect(self):
+        if not self.reconnect_seconds:
+            return None
+        return sum(self.reconnect_seconds) / len(self.reconnect_seconds)
+
+def format_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+def print_report(stats):
+    span = (stats.last_seen or 0) - (stats.first_seen or 0)
+    availability = stats.availability
+    if availability is None:
+        availability_text = "-"
+        color = Colors.DIM
+    else:
+        availability_text = f"{availability * 100:.1f}%"
+        color = Colors.SUCCESS if availability >= 0.99 else Colors.WARNING if availability >= 0.9 else Colors.ERROR
+
+    print(f"\n{Colors.PRIMARY}📱 {Colors.BOLD}{stats.name}{Colors.RESET} {Colors.DIM}({format_duration(span)} of history){Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Availability:       {color}{availability_text}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Sessions:           {stats.sessions}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Outages:            {len(stats.reconnect_seconds)}{' (+1 ongoing)' if stats.outage_started else ''}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Mean reconnect:     {format_duration(stats.mean_reconnect)}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Watchdog restarts:  {stats.stalls}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}Thermal steps:      {stats.throttles}{Colors.RESET}")
+    print(f"   {Colors.SUCCESS}scrcpy errors:      {stats.scrcpy_errors}{Colors.RESET}")
+
+    for path, path_stats in sorted(stats.paths.items()):
+        connect_rate = path_stats['failed'] / path_stats['attempts'] if path_stats['attempts'] else 0
+        drop_rate = path_stats['dropped'] / path_stats['sessions'] if path_stats['sessions'] else 0
+        print(
+            f"   {Colors.DIM}↳ {path:<10}{Colors.RESET} "
+            f"connect failed {Colors.PORT}{path_stats['failed']}/{path_stats['attempts']} ({connect_rate * 100:.0f}%){Colors.RESET} • "
+            f"dropped {Colors.PORT}{path_stats['dropped']}/{path_stats['sessions']} ({drop_rate * 100:.0f}%){Colors.RESET}"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Summarize the connection journal of every device.")
+    parser.add_argument("devices", nargs="*", help="device IDs to report on (default: every device in the journal)")
+    parser.add_argument("--since", type=float, help="only look at the last N hours")
+    parser.add_argument("--journal", default=JOURNAL_DIR, help="journal folder (default: journal/)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    since = time.time() - args.since * 3600 if args.since else 0
+
+    print(f"\n{Colors.PRIMARY}📊 CONNECTION JOURNAL REPORT{Colors.RESET}")
+    print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+
+    current_files = sorted(glob.glob(os.path.join(glob.escape(args.journal), "*.jsonl")))
+    if args.devices:
+        current_files = [path for path in current_files if os.path.basename(path)[:-len(".jsonl")] in args.devices]
+    if not current_files:
+        print(f"{Colors.ERROR}❌ No journal found in {args.journal}{Colors.RESET}")
+        print(f"{Colors.DIM}   ↳ run-scrcpy.py writes it while mirroring{Colors.RESET}")
+        return 1
+
+    for current in current_files:
+        stats = DeviceStats(os.path.basename(current)[:-len(".jsonl")])
+        for entry in read_events(journal_files(current), since):
+            stats.feed(entry)
+        print_report(stats)
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.PRIMARY}✨ Thank you! ✨{Colors.RESET}")
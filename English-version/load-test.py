@@ -0,0 +1,606 @@
+import os
+import subprocess
+import time
+import sys
+import json
+import socket
+import random
+import argparse
+import selectors
+import tempfile
+import threading
+import shutil
+import importlib.util
+
+try:
+    import resource
+except ImportError:
+    # Windows: no rlimits or rusage; the harness is POSIX only anyway
+    resource = None
+
+# Epic Color Palette 🎨
+class Colors:
+    PRIMARY = '\033[96m'    # Soft Cyan
+    SUCCESS = '\033[92m'    # Soft Green
+    WARNING = '\033[93m'    # Soft Yellow
+    ERROR = '\033[91m'      # Soft Red
+    DEVICE = '\033[95m'     # Soft Magenta
+    PORT = '\033[94m'       # Soft Blue
+    DIM = '\033[90m'        # Gray
+    BOLD = '\033[1m'        # Bold
+    RESET = '\033[0m'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where the stub adb/scrcpy find the simulator, and the folder of per-transport state files
+SIMULATOR_ENV = "SCRCPY_LOADTEST_SIMULATOR"
+
+# A mirroring stub turns into this loop (same pid): a few hundred sessions cost a
+# few hundred tiny shells instead of a few hundred Python interpreters
+MIRROR_LOOP = 'while [ -e "$1" ]; do echo "INFO: 60 fps"; sleep 1; done; echo "ERROR: Device disconnected"; exit 1'
+
+# A transport that went offline stays listed as "offline" this long before adb drops it
+OFFLINE_TRANSPORT_SECONDS = 10
+# Online without a session for this long counts as stuck in the report
+STUCK_SECONDS = 120
+# Memory growth is only extrapolated from at least this much settled run time
+GROWTH_MIN_SECONDS = 600
+# Time allowed after shutdown for scrcpy stubs to exit before they count as leaked
+LEAK_GRACE_SECONDS = 5
+
+def load_connector():
+    """Load run-scrcpy.py as a module (its dash keeps it from a plain import)"""
+    spec = importlib.util.spec_from_file_location("run_scrcpy", os.path.join(SCRIPT_DIR, "run-scrcpy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def percentile(values, share):
+    """Nearest-rank percentile of a list, None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+def simulator_request(address, request):
+    """One JSON request/reply with the fleet simulator"""
+    host, port = address.rsplit(":", 1)
+    with socket.create_connection((host, int(port))) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        reply = sock.makefile("rb").readline()
+    if not reply:
+        raise ConnectionError("fleet simulator closed the connection")
+    return json.loads(reply)
+
+def run_stub(tool, args):
+    """Entry point of the fake adb and scrcpy executables"""
+    try:
+        reply = simulator_request(os.environ[SIMULATOR_ENV], {"tool": tool, "args": args, "pid": os.getpid()})
+    except (OSError, ValueError, KeyError) as e:
+        sys.stderr.write(f"error: fleet simulator unavailable: {e}\n")
+        return 1
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.stderr.write(reply.get("stderr", ""))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if reply.get("mirror"):
+        os.execv("/bin/sh", ["sh", "-c", MIRROR_LOOP, "sh", reply["mirror"]])
+    return reply.get("code", 0)
+
+class VirtualDevice:
+    """One simulated phone whose wireless address comes and goes on a random schedule"""
+
+    def __init__(self, index, options, rng, now):
+        self.serial = f"SIM{index:04d}"
+        self.port = options.base_port + index
+        self.address = f"127.0.0.1:{self.port}"
+        self.slow = rng.random() < options.slow_share
+        self.online = True
+        self.transport = None
+        self.offline_since = None
+        self.online_since = now
+        self.waiting_since = now
+        self.first_session = True
+        self.next_change = now + rng.expovariate(1 / options.mean_online)
+        self.listener = None
+        self.outages = 0
+
+class FleetSimulator:
+    """Fake adb server and scrcpy backend for a fleet of virtual devices"""
+
+    def __init__(self, options):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.state_dir = options.state_dir
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.devices = {}
+        for index in range(options.devices):
+            device = VirtualDevice(index, options, self.rng, self.started)
+            self.devices[device.address] = device
+        self.selector = selectors.DefaultSelector()
+        self.sessions = {}
+        self.duplicate_sessions = 0
+        self.requests = 0
+        self.reconnect_seconds = []
+        self.first_connect_seconds = []
+
+    def state_file(self, device):
+        return os.path.join(self.state_dir, device.address.replace(":", "_"))
+
+    def set_transport(self, device, state):
+        """Track adb's view of the device; the mirror loop watches the state file"""
+        device.transport = state
+        path = self.state_file(device)
+        if state == "device":
+            open(path, "w").close()
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def open_listener(self, device):
+        """Accept TCP so the connector's reachability probe succeeds while online"""
+        listener = socket.socket()
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("127.0.0.1", device.port))
+        listener.listen(16)
+        listener.setblocking(False)
+        self.selector.register(listener, selectors.EVENT_READ)
+        device.listener = listener
+
+    def close_listener(self, device):
+        if device.listener:
+            self.selector.unregister(device.listener)
+            device.listener.close()
+            device.listener = None
+
+    def accept_probes(self):
+        while True:
+            for key, _ in self.selector.select(timeout=0.5):
+                try:
+                    connection, _ = key.fileobj.accept()
+                    connection.close()
+                except OSError:
+                    pass
+
+    def flap(self):
+        """Move devices between online and offline on their schedules"""
+        while True:
+            time.sleep(0.5)
+            now = time.time()
+            with self.lock:
+                for device in self.devices.values():
+                    if device.transport == "offline" and now - device.offline_since >= OFFLINE_TRANSPORT_SECONDS:
+                        device.transport = None
+                    if now < device.next_change:
+                        continue
+                    if device.online:
+                        device.online = False
+                        device.outages += 1
+                        device.offline_since = now
+                        device.waiting_since = None
+                        self.close_listener(device)
+                        if device.transport:
+                            self.set_transport(device, "offline")
+                        device.next_change = now + self.rng.expovariate(1 / self.options.mean_offline)
+                    else:
+                        device.online = True
+                        device.online_since = now
+                        device.waiting_since = now
+                        self.open_listener(device)
+                        device.next_change = now + self.rng.expovariate(1 / self.options.mean_online)
+
+    def handshake_delay(self, device):
+        if device.slow:
+            return self.rng.uniform(1, self.options.handshake_delay)
+        return self.rng.uniform(0.005, 0.05)
+
+    def adb(self, args):
+        serial = None
+        if args[:1] == ["-s"] and len(args) > 1:
+            serial, args = args[1], args[2:]
+        command = args[0] if args else ""
+
+        if command == "devices":
+            with self.lock:
+                lines = ["List of devices attached"]
+                for device in self.devices.values():
+                    if device.transport:
+                        extra = " product:sim model:Sim_Phone device:sim" if "-l" in args else ""
+                        lines.append(f"{device.address}\t{device.transport}{extra}")
+            return {"stdout": "\n".join(lines) + "\n\n"}
+        if command in ("connect", "disconnect"):
+            address = args[1] if len(args) > 1 else ""
+            device = self.devices.get(address)
+            if command == "disconnect":
+                if device and device.transport:
+                    with self.lock:
+                        self.set_transport(device, None)
+                    return {"stdout": f"disconnected {address}\n"}
+                return {"stdout": f"error: no such device '{address}'\n", "code": 1}
+            if device is None or not device.online:
+                return {"stdout": f"failed to connect to '{address}': Connection refused\n"}
+            time.sleep(self.handshake_delay(device))
+            with self.lock:
+                if not device.online:
+                    return {"stdout": f"failed to connect to '{address}': Connection reset by peer\n"}
+                already = device.transport == "device"
+                self.set_transport(device, "device")
+            return {"stdout": f"{'already connected' if already else 'connected'} to {address}\n"}
+        if command in ("version", "start-server", "kill-server"):
+            return {"stdout": "Android Debug Bridge version 1.0.41\n" if command == "version" else ""}
+
+        device = self.devices.get(serial)
+        if device is None or device.transport is None:
+            return {"stderr": f"error: device '{serial}' not found\n", "code": 1}
+        if device.transport != "device":
+            return {"stderr": "error: device offline\n", "code": 1}
+
+        # Every device round-trip costs a little; slow devices a lot more
+        time.sleep(self.handshake_delay(device) / 10)
+        if command == "get-state":
+            return {"stdout": "device\n"}
+        if command in ("wait-for-device", "forward"):
+            return {}
+        if command == "tcpip":
+            return {"stdout": f"restarting in TCP mode port: {device.port}\n"}
+        if command == "shell":
+            return self.shell(device, " ".join(args[1:]))
+        return {"stderr": f"adb: unknown command {command}\n", "code": 1}
+
+    def shell(self, device, command):
+        if command.startswith("echo "):
+            return {"stdout": command[len("echo "):] + "\n"}
+        if command.startswith("getprop"):
+            values = {"ro.serialno": device.serial, "service.adb.tcp.port": str(device.port), "ro.product.model": "Sim_Phone"}
+            return {"stdout": values.get(command.split()[-1], "") + "\n"}
+        if command.startswith("dumpsys"):
+            return {"stdout": "Thermal Status: 0\nCurrent Battery Service state:\n  status: 2\n  level: 80\n  temperature: 310\n"}
+        if command.startswith("ip"):
+            return {"stdout": f"3: wlan0    inet 127.0.0.1/8 scope global wlan0\n"}
+        return {}
+
+    def scrcpy(self, args, pid):
+        if "--version" in args:
+            return {"stdout": "scrcpy 3.3.3 <https://github.com/Genymobile/scrcpy>\n"}
+        serial = args[args.index("-s") + 1] if "-s" in args else None
+        device = self.devices.get(serial)
+        if device is None or device.transport != "device":
+            return {"stderr": "ERROR: Could not find any ADB device\n", "code": 1}
+        if "--list-encoders" in args:
+            return {"stdout": "[server] INFO: List of video encoders:\n    --video-codec=h264 --video-encoder=c2.sim.avc.encoder    (hw)\n"}
+        if "--no-playback" in args:
+            return {}
+
+        now = time.time()
+        with self.lock:
+            self.prune_sessions()
+            if any(session_serial == serial for session_serial, _ in self.sessions.values()):
+                self.duplicate_sessions += 1
+            self.sessions[pid] = (serial, now)
+            if device.waiting_since is not None:
+                waited = now - device.waiting_since
+                (self.first_connect_seconds if device.first_session else self.reconnect_seconds).append(waited)
+                device.first_session = False
+                device.waiting_since = None
+        return {
+            "stdout": "INFO: scrcpy 3.3.3 <https://github.com/Genymobile/scrcpy>\n"
+                      "[server] INFO: Device: [Sim] Sim Phone (Android 14)\n"
+                      "INFO: Renderer: simulated\nINFO: Texture: 1080x2400\n",
+            "mirror": self.state_file(device),
+        }
+
+    def prune_sessions(self):
+        """Forget scrcpy stubs that have exited"""
+        for pid in list(self.sessions):
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                del self.sessions[pid]
+
+    def status(self):
+        now = time.time()
+        with self.lock:
+            self.prune_sessions()
+            live = {serial for serial, _ in self.sessions.values()}
+            stuck = sorted(
+                device.serial for device in self.devices.values()
+                if device.online and device.address not in live and now - device.online_since >= STUCK_SECONDS
+            )
+            return {
+                "sessions": len(self.sessions),
+                "online": sum(1 for device in self.devices.values() if device.online),
+                "requests": self.requests,
+                "outages": sum(device.outages for device in self.devices.values()),
+                "duplicate_sessions": self.duplicate_sessions,
+                "reconnect_seconds": self.reconnect_seconds,
+                "first_connect_seconds": self.first_connect_seconds,
+                "stuck": stuck,
+                "session_pids": sorted(self.sessions),
+            }
+
+    def handle(self, connection):
+        with connection:
+            try:
+                request = json.loads(connection.makefile("rb").readline())
+            except ValueError:
+                # A stub killed by the connector's timeout before it sent anything
+                return
+            tool = request.get("tool")
+            if tool == "adb":
+                with self.lock:
+                    self.requests += 1
+                reply = self.adb(request["args"])
+            elif tool == "scrcpy":
+                reply = self.scrcpy(request["args"], request["pid"])
+            elif tool == "status":
+                reply = self.status()
+            else:
+                reply = {"stderr": f"unknown tool {tool}\n", "code": 1}
+            try:
+                connection.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+            except OSError:
+                # The stub was killed while the simulator worked on its reply
+                pass
+
+    def serve(self):
+        for device in self.devices.values():
+            self.open_listener(device)
+        threading.Thread(target=self.accept_probes, daemon=True).start()
+        threading.Thread(target=self.flap, daemon=True).start()
+
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(128)
+        # The harness waits for this line before starting the connector
+        print(server.getsockname()[1], flush=True)
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+def process_rss():
+    """Resident memory of this process in bytes"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # Peak, not current, where /proc is missing; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def open_fds():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+class LoadTest:
+    """Drive the real connector against a simulated fleet and measure it"""
+
+    def __init__(self, options):
+        self.options = options
+        self.work_dir = tempfile.mkdtemp(prefix="scrcpy-loadtest-")
+        self.tools_dir = os.path.join(self.work_dir, "tools")
+        self.state_dir = os.path.join(self.work_dir, "state")
+        self.simulator = None
+        self.address = None
+        self.samples = []
+
+    def install_stubs(self):
+        """adb and scrcpy stand-ins, plus the server file a real scrcpy folder has"""
+        os.makedirs(self.tools_dir)
+        os.makedirs(self.state_dir)
+        for tool in ("adb", "scrcpy"):
+            path = os.path.join(self.tools_dir, tool)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f'#!/bin/sh\nexec "{sys.executable}" -S "{os.path.abspath(__file__)}" --stub {tool} "$@"\n')
+            os.chmod(path, 0o755)
+        with open(os.path.join(self.tools_dir, "scrcpy-server"), "wb") as f:
+            f.write(os.urandom(64 * 1024))
+
+    def write_config(self):
+        options = self.options
+        config = {
+            "scrcpy_folder": self.tools_dir,
+            "upgrade_policy": "off",
+            "usb_bootstrap": False,
+            "adb_concurrency": options.adb_concurrency,
+            "journal_max_size": 0,
+            "config_reload_interval": 0,
+            "priority": ["local-ip"],
+            "devices": [
+                {"device_id": f"SIM{index:04d}", "local_ip": "127.0.0.1", "port": options.base_port + index}
+                for index in range(options.devices)
+            ],
+        }
+        path = os.path.join(self.work_dir, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=4)
+        return path
+
+    def start_simulator(self):
+        options = self.options
+        self.simulator = subprocess.Popen(
+            [
+                sys.executable, os.path.abspath(__file__), "--simulator", "--state-dir", self.state_dir,
+                "--devices", str(options.devices), "--base-port", str(options.base_port),
+                "--mean-online", str(options.mean_online), "--mean-offline", str(options.mean_offline),
+                "--slow-share", str(options.slow_share), "--handshake-delay", str(options.handshake_delay),
+                "--seed", str(options.seed),
+            ],
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        port = self.simulator.stdout.readline().strip()
+        if not port:
+            raise RuntimeError("fleet simulator did not start")
+        self.address = f"127.0.0.1:{port}"
+        os.environ[SIMULATOR_ENV] = self.address
+
+    def sample(self, started):
+        times = os.times()
+        status = simulator_request(self.address, {"tool": "status"})
+        self.samples.append({
+            "t": time.time() - started,
+            "cpu": times.user + times.system,
+            "rss": process_rss(),
+            "threads": threading.active_count(),
+            "fds": open_fds(),
+            "sessions": status["sessions"],
+            "online": status["online"],
+            "requests": status["requests"],
+        })
+        return self.samples[-1]
+
+    def print_progress(self, sample):
+        print(
+            f"{Colors.DIM}[{sample['t'] / 60:6.1f}m]{Colors.RESET} "
+            f"{Colors.SUCCESS}{sample['sessions']}/{sample['online']} mirroring{Colors.RESET} • "
+            f"{Colors.PORT}{(sample['rss'] or 0) / 1048576:.0f} MB{Colors.RESET} • "
+            f"{sample['threads']} threads • {sample['fds']} fds • {sample['requests']} adb calls"
+        )
+
+    def run(self):
+        options = self.options
+        self.install_stubs()
+        config_file = self.write_config()
+        self.start_simulator()
+
+        connector = load_connector()
+        log_path = os.path.join(self.work_dir, "connector.log")
+        log = open(log_path, "w", encoding="utf-8")
+        ui = connector.Dashboard(stream=log)
+        registry = connector.DeviceRegistry(os.path.join(self.work_dir, "devices.db"))
+
+        print(f"\n{Colors.PRIMARY}🏋️  LOAD TEST{Colors.RESET}")
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        print(f"{Colors.PRIMARY}📱 {options.devices} simulated devices for {options.duration / 60:.0f} minutes{Colors.RESET}")
+        print(f"{Colors.DIM}   ↳ Connector log: {log_path}{Colors.RESET}")
+
+        started = time.time()
+        self.sample(started)
+        fleet = connector.FleetManager(config_file, ui=ui, registry=registry)
+        threading.Thread(target=fleet.main, daemon=True).start()
+
+        try:
+            while time.time() - started < options.duration:
+                time.sleep(min(options.sample_interval, max(options.duration - (time.time() - started), 0.1)))
+                self.print_progress(self.sample(started))
+        except KeyboardInterrupt:
+            print(f"{Colors.WARNING}⏹️  Stopped early - reporting what was measured{Colors.RESET}")
+
+        final = simulator_request(self.address, {"tool": "status"})
+        fleet.shutdown()
+        time.sleep(LEAK_GRACE_SECONDS)
+        leaked = simulator_request(self.address, {"tool": "status"})["session_pids"]
+        log.close()
+        return self.report(final, leaked)
+
+    def report(self, status, leaked):
+        samples = self.samples
+        first, last = samples[0], samples[-1]
+        elapsed = max(last["t"] - first["t"], 1e-6)
+        cpu_rates = [
+            (after["cpu"] - before["cpu"]) / max(after["t"] - before["t"], 1e-6)
+            for before, after in zip(samples, samples[1:])
+        ]
+        # Skip the first quarter: startup allocations are not leaks
+        settled = next(sample for sample in samples if sample["t"] >= elapsed / 4)
+
+        def row(label, value, color=Colors.SUCCESS):
+            print(f"   {color}{label:<22}{value}{Colors.RESET}")
+
+        def series(key, scale=1, unit=""):
+            values = [sample[key] for sample in samples if sample[key] is not None]
+            if not values:
+                return "-"
+            return f"{values[0] / scale:.0f}{unit} → peak {max(values) / scale:.0f}{unit} → end {values[-1] / scale:.0f}{unit}"
+
+        def seconds(values):
+            if not values:
+                return "-"
+            return (
+                f"p50 {percentile(values, 0.5):.1f}s • p90 {percentile(values, 0.9):.1f}s • "
+                f"p99 {percentile(values, 0.99):.1f}s • max {max(values):.1f}s ({len(values)})"
+            )
+
+        print(f"\n{Colors.PRIMARY}📊 LOAD TEST REPORT{Colors.RESET}")
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        row("Duration:", f"{elapsed / 60:.1f} minutes, {self.options.devices} devices")
+        row("Connector CPU:", f"{(last['cpu'] - first['cpu']) / elapsed * 100:.1f}% of a core on average, peak {max(cpu_rates or [0]) * 100:.0f}%")
+        row("Memory (RSS):", series("rss", 1048576, " MB"))
+        if settled["rss"] and last["rss"] and last["t"] - settled["t"] >= GROWTH_MIN_SECONDS:
+            growth = (last["rss"] - settled["rss"]) / 1048576 / ((last["t"] - settled["t"]) / 3600)
+            row("Memory growth:", f"{growth:+.1f} MB/hour after warm-up", Colors.WARNING if growth > 10 else Colors.SUCCESS)
+        row("Threads:", series("threads"))
+        row("File descriptors:", series("fds"))
+        row("adb calls:", f"{status['requests']} ({status['requests'] / elapsed:.1f}/s)")
+        row("Outages simulated:", status["outages"])
+        row("First connect:", seconds(status["first_connect_seconds"]))
+        row("Reconnect:", seconds(status["reconnect_seconds"]))
+
+        problems = 0
+        for label, items in (
+            ("Duplicate sessions:", status["duplicate_sessions"]),
+            ("Stuck devices:", len(status["stuck"])),
+            ("Leaked processes:", len(leaked)),
+        ):
+            problems += 1 if items else 0
+            row(label, items, Colors.ERROR if items else Colors.SUCCESS)
+        if status["stuck"]:
+            print(f"      {Colors.DIM}↳ online for {STUCK_SECONDS}s+ without a session: {', '.join(status['stuck'][:10])}{Colors.RESET}")
+        if leaked:
+            print(f"      {Colors.DIM}↳ scrcpy stubs still running after shutdown: {', '.join(map(str, leaked[:10]))}{Colors.RESET}")
+        return 1 if problems else 0
+
+    def cleanup(self):
+        if self.simulator and self.simulator.poll() is None:
+            self.simulator.terminate()
+        if self.options.keep:
+            print(f"{Colors.DIM}   ↳ Kept {self.work_dir}{Colors.RESET}")
+        else:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Soak-test the connector against a simulated fleet of flapping devices.")
+    parser.add_argument("--devices", type=int, default=100, help="number of simulated devices")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds to run")
+    parser.add_argument("--mean-online", type=float, default=600, help="average seconds a device stays reachable")
+    parser.add_argument("--mean-offline", type=float, default=30, help="average seconds an outage lasts")
+    parser.add_argument("--slow-share", type=float, default=0.1, help="share of devices with slow handshakes")
+    parser.add_argument("--handshake-delay", type=float, default=5, help="longest handshake of a slow device in seconds")
+    parser.add_argument("--adb-concurrency", type=int, default=4, help="adb_concurrency for the connector")
+    parser.add_argument("--sample-interval", type=float, default=10, help="seconds between measurements")
+    parser.add_argument("--base-port", type=int, default=40000, help="TCP port of the first simulated device")
+    parser.add_argument("--seed", type=int, default=1, help="random seed, so a flapping pattern can be replayed")
+    parser.add_argument("--keep", action="store_true", help="keep the work folder with the connector log")
+    parser.add_argument("--simulator", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--state-dir", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    # The stub adb/scrcpy re-enter here; keep that path free of anything slow
+    if len(sys.argv) > 2 and sys.argv[1] == "--stub":
+        sys.exit(run_stub(sys.argv[2], sys.argv[3:]))
+
+    args = parse_args()
+    if args.simulator:
+        FleetSimulator(args).serve()
+        sys.exit(0)
+    if os.name == "nt":
+        print(f"{Colors.ERROR}❌ The load test needs Linux or macOS (its stub tools are shell scripts){Colors.RESET}")
+        sys.exit(1)
+
+    test = LoadTest(args)
+    try:
+        sys.exit(test.run())
+    except KeyboardInterrupt:
+        print(f"\n{Colors.PRIMARY}✨ Thank you! ✨{Colors.RESET}")
+    finally:
+        test.cleanup()
@@ -0,0 +1,284 @@
+import os
+import subprocess
+import time
+import sys
+import json
+import argparse
+import queue
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# Epic Color Palette 🎨
+class Colors:
+    PRIMARY = '\033[96m'    # Soft Cyan
+    SUCCESS = '\033[92m'    # Soft Green
+    WARNING = '\033[93m'    # Soft Yellow
+    ERROR = '\033[91m'      # Soft Red
+    DEVICE = '\033[95m'     # Soft Magenta
+    PORT = '\033[94m'       # Soft Blue
+    DIM = '\033[90m'        # Gray
+    BOLD = '\033[1m'        # Bold
+    RESET = '\033[0m'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Printed after every command together with its exit code
+SHELL_MARKER = "__SCRCPY_TOOLKIT_DONE__"
+
+def load_connector():
+    """Load run-scrcpy.py as a module (its dash keeps it from a plain import)"""
+    spec = importlib.util.spec_from_file_location("run_scrcpy", os.path.join(SCRIPT_DIR, "run-scrcpy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class ShellSession:
+    """One long-lived adb shell on a device; command batches are pipelined through it"""
+
+    def __init__(self, serial, adb, server_port=None, env=None):
+        self.serial = serial
+        self.adb = adb
+        self.server_port = server_port
+        self.env = env
+        self.process = None
+        self.lines = None
+        self.lock = threading.Lock()
+
+    def open(self):
+        self.process = subprocess.Popen(
+            ["adb", "-s", self.serial, "shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+            env=self.env
+        )
+        self.lines = queue.Queue()
+        threading.Thread(target=self.read_output, args=(self.process, self.lines), daemon=True).start()
+
+    def read_output(self, process, lines):
+        for line in process.stdout:
+            lines.put(line.decode("utf-8", errors="replace"))
+        lines.put(None)
+
+    def is_open(self):
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        if not self.is_open():
+            return
+        try:
+            self.process.stdin.write(b"exit\n")
+            self.process.stdin.flush()
+            self.process.wait(timeout=2)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+    def run_batch(self, commands, timeout=30):
+        """Send every command in one write, then collect each one's exit code and output"""
+        # A batch counts as one adb command: it waits for a slot like the connector's own
+        with self.lock, self.adb.admitted(f"adb -s {self.serial} shell", self.server_port):
+            if not self.is_open():
+                self.open()
+
+            # stdin is closed per command so nothing can swallow the commands queued after it.
+            # Bytes, not text: on Windows a text pipe would send \r\n to the device shell.
+            script = "".join(
+                f"{{ {command}\n}} </dev/null 2>&1; echo \"{SHELL_MARKER} $?\"\n" for command in commands
+            )
+            try:
+                self.process.stdin.write(script.encode("utf-8"))
+                self.process.stdin.flush()
+            except (OSError, ValueError):
+                pass
+
+            results = []
+            output = []
+            deadline = time.time() + timeout
+            while len(results) < len(commands):
+                try:
+                    line = self.lines.get(timeout=max(deadline - time.time(), 0))
+                except queue.Empty:
+                    line = None
+                    error = f"timed out after {timeout}s"
+                else:
+                    error = "shell closed"
+
+                if line is None:
+                    # The shell is in an unknown state now; the next batch gets a fresh one
+                    if self.is_open():
+                        self.process.kill()
+                    for command in commands[len(results):]:
+                        results.append({'command': command, 'exit_code': None, 'output': "".join(output).strip() or error})
+                        output = []
+                    break
+
+                if SHELL_MARKER in line:
+                    # Output without a trailing newline ends up on the marker line
+                    text, _, status = line.partition(SHELL_MARKER)
+                    try:
+                        exit_code = int(status.strip() or -1)
+                    except ValueError:
+                        # Garbled marker line: keep the raw text, the exit code is unknown
+                        text, exit_code = line, None
+                    output.append(text)
+                    results.append({
+                        'command': commands[len(results)],
+                        'exit_code': exit_code,
+                        'output': "".join(output).strip(),
+                    })
+                    output = []
+                else:
+                    output.append(line)
+
+            return results
+
+class ShellPool:
+    """One ShellSession per device, reused for every batch"""
+
+    def __init__(self, adb, server_env):
+        self.adb = adb
+        self.server_env = server_env
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, serial, server_port=None):
+        with self.lock:
+            if serial not in self.sessions:
+                self.sessions[serial] = ShellSession(serial, self.adb, server_port, self.server_env(server_port))
+            return self.sessions[serial]
+
+    def broadcast(self, serials, commands, timeout=30):
+        """Run the same batch on every device at once; returns {serial: results}
+
+        serials maps each serial to the adb server port it is connected through (None for the default).
+        """
+        with ThreadPoolExecutor(max_workers=max(len(serials), 1)) as pool:
+            results = pool.map(lambda serial: self.get(serial, serials[serial]).run_batch(commands, timeout), serials)
+            return dict(zip(serials, results))
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+class CommandBroadcaster:
+    """Send the same shell commands to many devices"""
+
+    def __init__(self, config_file="config.json"):
+        self.config = self.load_config(config_file)
+        connector = load_connector()
+        # Same adb limit and adb servers as the connector, so a broadcast cannot swamp them
+        self.adb = connector.AdbScheduler(int(self.config.get("adb_concurrency", 4)))
+        servers = int(self.config.get("adb_servers", 1))
+        first_port = int(self.config.get("adb_server_port", 5037))
+        self.server_ports = list(range(first_port, first_port + servers)) if servers > 1 else [None]
+        self.pool = ShellPool(self.adb, connector.adb_server_env)
+        self.setup_environment()
+
+    def load_config(self, config_file):
+        """Load configuration from JSON file"""
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"{Colors.WARNING}⚠️  Could not read {config_file}: {e}{Colors.RESET}")
+            return {}
+
+    def setup_environment(self):
+        """Setup scrcpy environment and PATH"""
+        scrcpy_folder = self.config.get("scrcpy_folder", "scrcpy-win64-v3.3.3")
+
+        if os.path.exists(scrcpy_folder):
+            os.chdir(scrcpy_folder)
+            # Add current directory to PATH for adb
+            os.environ['PATH'] = os.getcwd() + os.pathsep + os.environ['PATH']
+        else:
+            print(f"{Colors.ERROR}❌ scrcpy folder not found: {scrcpy_folder}{Colors.RESET}")
+            sys.exit(1)
+
+    def list_devices(self):
+        """Every transport an adb server sees as "device", mapped to that server's port"""
+        serials = {}
+        for server_port in self.server_ports:
+            try:
+                output = self.adb.run("adb devices", timeout=10, server_port=server_port).stdout
+            except subprocess.TimeoutExpired:
+                print(f"{Colors.WARNING}⚠️  adb server :{server_port} is not answering{Colors.RESET}")
+                continue
+            for line in output.strip().split('\n')[1:]:
+                parts = line.split('\t')
+                if len(parts) >= 2 and parts[1].strip() == "device":
+                    serials.setdefault(parts[0].strip(), server_port)
+        return serials
+
+    def print_results(self, serial, results):
+        failed = sum(1 for result in results if result['exit_code'] != 0)
+        color = Colors.SUCCESS if not failed else Colors.WARNING
+        print(f"{color}📱 {Colors.DEVICE}{serial}{Colors.RESET} {color}{len(results) - failed}/{len(results)} ok{Colors.RESET}")
+        for result in results:
+            icon = "✅" if result['exit_code'] == 0 else "❌"
+            code = "-" if result['exit_code'] is None else result['exit_code']
+            print(f"   {icon} {result['command']} {Colors.DIM}(exit {code}){Colors.RESET}")
+            for line in result['output'].split('\n') if result['output'] else []:
+                print(f"      {Colors.DIM}{line}{Colors.RESET}")
+
+    def main(self, commands, serials=None, timeout=30):
+        print(f"\n{Colors.PRIMARY}📨 SEND COMMANDS{Colors.RESET}")
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+
+        if serials:
+            # Named on the command line: found on whichever adb server holds them
+            known = self.list_devices()
+            serials = {serial: known.get(serial, self.server_ports[0]) for serial in serials}
+        else:
+            serials = self.list_devices()
+        if not serials:
+            print(f"{Colors.ERROR}❌ No devices detected{Colors.RESET}")
+            return 1
+
+        started = time.time()
+        try:
+            all_results = self.pool.broadcast(serials, commands, timeout)
+        finally:
+            self.pool.close()
+        elapsed = time.time() - started
+
+        for serial in serials:
+            self.print_results(serial, all_results[serial])
+
+        devices_ok = sum(
+            1 for results in all_results.values() if all(result['exit_code'] == 0 for result in results)
+        )
+        color = Colors.SUCCESS if devices_ok == len(serials) else Colors.WARNING
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        print(f"{color}📨 {len(commands)} commands on {devices_ok}/{len(serials)} devices in {elapsed:.1f}s{Colors.RESET}")
+        return 0 if devices_ok == len(serials) else 1
+
+def read_command_file(path):
+    """One command per line; blank lines and # comments are skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the same shell commands on many devices at once.")
+    parser.add_argument("commands", nargs="*", help='shell commands, e.g. "input keyevent KEYCODE_WAKEUP"')
+    parser.add_argument("-s", "--device", action="append", dest="serials", help="adb serial to use (repeatable; default: every connected device)")
+    parser.add_argument("-f", "--file", help="read commands from a file, one per line")
+    parser.add_argument("--timeout", type=int, default=30, help="seconds to wait for one device to finish the batch")
+    args = parser.parse_args()
+    if args.file:
+        args.commands += read_command_file(args.file)
+    if not args.commands:
+        parser.error("no commands given")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        broadcaster = CommandBroadcaster()
+        sys.exit(broadcaster.main(args.commands, args.serials, args.timeout))
+    except KeyboardInterrupt:
+        print(f"\n{Colors.PRIMARY}✨ Thank you! ✨{Colors.RESET}")
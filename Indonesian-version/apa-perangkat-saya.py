@@ -3,6 +3,9 @@ import subprocess
 import time
 import sys
 import json
+import importlib.util
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
 
 # Epic Color Palette 🎨
 class Colors:
@@ -16,9 +19,24 @@ class Colors:
     BOLD = '\033[1m'        # Bold
     RESET = '\033[0m'
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Tailscale membagikan alamat dari range CGNAT
+TAILSCALE_NETWORK = ipaddress.ip_network("100.64.0.0/10")
+
+def load_connector():
+    """Load jalankan-scrcpy.py as a module (its dash keeps it from a plain import)"""
+    spec = importlib.util.spec_from_file_location("run_scrcpy", os.path.join(SCRIPT_DIR, "jalankan-scrcpy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 class DeviceDetector:
     def __init__(self, config_file="config.json"):
         self.config = self.load_config(config_file)
+        connector = load_connector()
+        self.registry = connector.DeviceRegistry()
+        self.adb = connector.AdbScheduler()
         self.setup_environment()
         
     def load_config(self, config_file):
@@ -49,7 +67,7 @@ class DeviceDetector:
     def run_command(self, cmd, silent=False):
         """Run command and return output"""
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            result = self.adb.run(cmd)
             if not silent and result.stdout.strip():
                 print(f"{Colors.DIM}↳ {result.stdout.strip()}{Colors.RESET}")
             return result.stdout
@@ -113,8 +131,13 @@ class DeviceDetector:
             # Get product model
             product_model_output = self.run_command(f"adb -s {device_id} shell getprop ro.product.model", silent=True)
             product_model = product_model_output.strip() if product_model_output.strip() else model
+
+            # Ambil serial hardware (ID adb perangkat jaringan cuma ip:port)
+            serial_output = self.run_command(f"adb -s {device_id} shell getprop ro.serialno", silent=True)
+            serial = serial_output.strip() if serial_output.strip() else device_id
             
             return {
+                'serial': serial,
                 'model': model,
                 'brand': brand,
                 'android_version': android_version,
@@ -124,6 +147,7 @@ class DeviceDetector:
         except Exception as e:
             print(f"{Colors.DIM}↳ Tidak bisa mendapatkan detail perangkat: {e}{Colors.RESET}")
             return {
+                'serial': device_id,
                 'model': 'Unknown',
                 'brand': 'Unknown', 
                 'android_version': 'Unknown',
@@ -131,13 +155,57 @@ class DeviceDetector:
                 'product_model': 'Unknown'
             }
 
+    def get_device_addresses(self, device_id):
+        """Get the device's LAN and Tailscale IPs as {kind: ip}"""
+        # "3: wlan0    inet 192.168.1.30/24 brd 192.168.1.255 scope global wlan0"
+        output = self.run_command(f"adb -s {device_id} shell ip -o -f inet addr show", silent=True)
+        addresses = {}
+        
+        for line in output.strip().split('\n'):
+            parts = line.split()
+            if 'inet' not in parts or len(parts) < 4:
+                continue
+            interface = parts[1]
+            try:
+                ip = ipaddress.ip_address(parts[parts.index('inet') + 1].split('/')[0])
+            except ValueError:
+                continue
+            
+            if ip.is_loopback:
+                continue
+            if ip in TAILSCALE_NETWORK:
+                addresses.setdefault('tailscale', str(ip))
+            elif interface.startswith(('wlan', 'eth')):
+                addresses.setdefault('lan', str(ip))
+        
+        return addresses
+
+    def save_to_registry(self, device, details):
+        """Remember the device so jalankan-scrcpy.py can resolve it without probing"""
+        serial = details['serial']
+        addresses = self.get_device_addresses(device['id'])
+        
+        self.registry.record_device(serial, details)
+        for kind, address in addresses.items():
+            self.registry.record_address(serial, address, kind)
+        return serial, addresses
+
     def display_devices_list(self, devices):
-        """Display list of devices for user selection"""
+        """Display list of devices for user selection; returns what was saved per device ID"""
+        known = {}
         print(f"\n{Colors.SUCCESS}🎯 PERANGKAT YANG DITEMUKAN:{Colors.RESET}")
         print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
         
-        for index, device in enumerate(devices, 1):
+        def collect(device):
             details = self.get_device_details(device['id'])
+            return details, self.save_to_registry(device, details)
+
+        # Query semua perangkat sekaligus; scheduler adb menjaga server adb tidak kebanjiran
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            collected = list(pool.map(collect, devices))
+
+        for index, (device, (details, registered)) in enumerate(zip(devices, collected), 1):
+            known[device['id']] = (details, registered)
             
             device_icon = "🔌" if device['type'] == 'USB' else "🌐"
             type_color = Colors.WARNING if device['type'] == 'USB' else Colors.PRIMARY
@@ -148,6 +216,8 @@ class DeviceDetector:
             print(f"   {Colors.DIM}Android {details['android_version']} • {details['device_name']}{Colors.RESET}")
             print(f"{Colors.DIM}   ──────────────────────────────────────{Colors.RESET}")
 
+        return known
+
     def get_user_choice(self, devices):
         """Get user choice for device selection"""
         while True:
@@ -167,9 +237,9 @@ class DeviceDetector:
             except Exception as e:
                 print(f"{Colors.ERROR}❌ Error: {e}{Colors.RESET}")
 
-    def display_device_info(self, device):
+    def display_device_info(self, device, details, registered):
         """Display device information in beautiful format"""
-        details = self.get_device_details(device['id'])
+        serial, addresses = registered
         
         print(f"\n{Colors.SUCCESS}🎯 PERANGKAT DIPILIH!{Colors.RESET}")
         print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
@@ -191,6 +261,12 @@ class DeviceDetector:
         
         print(f"{Colors.PRIMARY}🔧 {Colors.BOLD}Status:{Colors.RESET}")
         print(f"   {Colors.SUCCESS}Status:    {device['status']}{Colors.RESET}")
+
+        print(f"{Colors.PRIMARY}💾 {Colors.BOLD}Tersimpan di registry perangkat:{Colors.RESET}")
+        print(f"   {Colors.SUCCESS}Serial:    {serial}{Colors.RESET}")
+        print(f"   {Colors.SUCCESS}IP Lokal:  {addresses.get('lan', '-')}{Colors.RESET}")
+        print(f"   {Colors.SUCCESS}Tailscale: {addresses.get('tailscale', '-')}{Colors.RESET}")
+        print(f"   {Colors.DIM}↳ config.json cukup berisi \"device_id\": \"{serial}\"{Colors.RESET}")
         
         print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
 
@@ -279,7 +355,7 @@ class DeviceDetector:
             return
 
         # Tampilkan daftar perangkat dan minta user memilih
-        self.display_devices_list(devices)
+        known = self.display_devices_list(devices)
         
         # Jika hanya ada 1 device, langsung pakai
         if len(devices) == 1:
@@ -289,7 +365,7 @@ class DeviceDetector:
             # Minta user memilih perangkat
             device = self.get_user_choice(devices)
 
-        self.display_device_info(device)
+        self.display_device_info(device, *known[device['id']])
 
         # Konfirmasi menjalankan scrcpy
         print(f"\n{Colors.PRIMARY}🚀 Menjalankan scrcpy...{Colors.RESET}")
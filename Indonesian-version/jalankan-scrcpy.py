@@ -4,6 +4,26 @@ import time
 import sys
 import threading
 import json
+import hashlib
+import re
+import socket
+import atexit
+import difflib
+import sqlite3
+import multiprocessing
+import queue
+import signal
+import itertools
+import contextlib
+import collections
+import tempfile
+import bisect
+
+try:
+    import resource
+except ImportError:
+    # Windows tidak punya rlimit; scrcpy diberi priority class lebih rendah
+    resource = None
 
 # Epic Color Palette 🎨
 class Colors:
@@ -17,64 +37,1716 @@ class Colors:
     BOLD = '\033[1m'        # Bold
     RESET = '\033[0m'
 
-class ScrcpyManager:
-    def __init__(self, config_file="config.json"):
-        self.config = self.load_config(config_file)
-        self.setup_environment()
-        
-    def load_config(self, config_file):
-        """Load configuration from JSON file"""
+# Folder script ini; connector nanti pindah ke folder scrcpy
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEVICE_REGISTRY_FILE = os.path.join(SCRIPT_DIR, "devices.db")
+JOURNAL_DIR = os.path.join(SCRIPT_DIR, "journal")
+# File output scrcpy dan state yang diserahkan dari satu run connector ke run berikutnya
+SESSIONS_DIR = os.path.join(SCRIPT_DIR, "sessions")
+HANDOFF_FILE = os.path.join(SESSIONS_DIR, "handoff.json")
+
+# Tempat stream-hub menyimpan salinan server yang di-stage. Berversi, supaya cleanup
+# sesi klien scrcpy (yang mem-push salinannya sendiri) tidak pernah menghapusnya.
+DEVICE_STAGING_DIR = "/data/local/tmp"
+
+# "INFO: 60 fps" / "INFO: 58 fps (+2 frames skipped)" dari scrcpy --print-fps
+FPS_PATTERN = re.compile(r"\b(\d+) fps\b")
+
+# Makin kecil makin cepat: kabel mengalahkan LAN, LAN mengalahkan hop VPN
+PATH_RANK = {"usb": 0, "wifi": 1, "tailscale": 2}
+
+# Sesi-sesi satu ponsel (layarnya sendiri dan display virtualnya) connect satu per satu
+CONNECT_LOCKS = collections.defaultdict(threading.Lock)
+# Jalur yang dipakai mirroring tiap sesi itu: {device_id: {pipeline_id: target}}
+ACTIVE_TARGETS = collections.defaultdict(dict)
+
+# Sesi dianggap idle setelah sekian detik "0 fps" (tidak ada perubahan di layar)
+UPGRADE_IDLE_SECONDS = 5
+
+class ConfigError(Exception):
+    """config.json does not match the schema; carries every problem found"""
+
+    def __init__(self, problems):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+PRIORITY_METHODS = ("tailscale", "local-ip", "usb")
+UPGRADE_POLICIES = ("off", "idle", "confirm", "immediate")
+ENCODER_SELECTIONS = ("off", "auto", "benchmark")
+
+def config_int(value):
+    """Accept 3 or "3" (older configs store numbers as strings)"""
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"expected a number, got {value!r}")
+    if number < 0:
+        raise ValueError("must not be negative")
+    return number
+
+def config_str(value):
+    if not isinstance(value, (str, int)) or isinstance(value, bool):
+        raise ValueError("expected text")
+    return str(value).strip()
+
+def config_bool(value):
+    """Accept true/false as JSON booleans or as strings"""
+    if isinstance(value, bool):
+        return value
+    text = config_str(value).lower()
+    if text in ("true", "yes", "1"):
+        return True
+    if text in ("false", "no", "0"):
+        return False
+    raise ValueError("expected true or false")
+
+def config_policy(value):
+    policy = config_str(value).lower()
+    if policy not in UPGRADE_POLICIES:
+        raise ValueError(f"expected one of {', '.join(UPGRADE_POLICIES)}")
+    return policy
+
+def config_encoder_selection(value):
+    selection = config_str(value).lower()
+    if selection not in ENCODER_SELECTIONS:
+        raise ValueError(f"expected one of {', '.join(ENCODER_SELECTIONS)}")
+    return selection
+
+def config_display_name(value):
+    name = config_str(value)
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+        raise ValueError("expected letters, digits, '-' or '_'")
+    return name
+
+def config_display_size(value):
+    """"1920x1080", "1920x1080/420", "/240" or "" (scrcpy --new-display syntax)"""
+    size = config_str(value)
+    if not re.fullmatch(r"(\d+x\d+)?(/\d+)?", size):
+        raise ValueError(f"expected WIDTHxHEIGHT, WIDTHxHEIGHT/DPI or /DPI, got {size!r}")
+    return size
+
+def config_pin(value):
+    pin = config_str(value)
+    if not re.fullmatch(r"\d*", pin):
+        raise ValueError("expected digits only")
+    return pin
+
+def config_priority(value):
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"expected a non-empty list of {', '.join(PRIORITY_METHODS)}")
+    for method in value:
+        if method not in PRIORITY_METHODS:
+            raise ValueError(f"unknown method {method!r}, expected {', '.join(PRIORITY_METHODS)}")
+    if len(set(value)) != len(value):
+        raise ValueError("methods must not repeat")
+    return list(value)
+
+# key: (parser, default). Key REQUIRED tidak punya default.
+REQUIRED = object()
+
+SETTINGS_SCHEMA = {
+    "scrcpy_folder": (config_str, "scrcpy-win64-v3.3.3"),
+    "timeout_delay": (config_int, 3),
+    "auto_reconnect_delay": (config_int, 3),
+    "watchdog_timeout": (config_int, 10),
+    "watchdog_interval": (config_int, 3),
+    "upgrade_policy": (config_policy, "idle"),
+    "upgrade_check_interval": (config_int, 10),
+    "config_reload_interval": (config_int, 1),
+    "tailscale_socket": (config_str, ""),
+    "usb_bootstrap": (config_bool, True),
+    "worker_processes": (config_bool, False),
+    "scrcpy_nice": (config_int, 0),
+    "scrcpy_memory_limit": (config_int, 0),
+    "adb_concurrency": (config_int, 4),
+    "adb_servers": (config_int, 1),
+    "adb_server_port": (config_int, 5037),
+    "journal_max_size": (config_int, 1024),
+    "journal_backups": (config_int, 3),
+    "diagnostic_lines": (config_int, 50),
+    "keepalive_interval": (config_int, 15),
+    "encoder_selection": (config_encoder_selection, "auto"),
+    "thermal_check_interval": (config_int, 30),
+    "thermal_max_status": (config_int, 2),
+    "battery_max_temperature": (config_int, 42),
+    "battery_min_level": (config_int, 15),
+    "session_handoff": (config_bool, False),
+}
+
+# Key per perangkat. Di level teratas menjelaskan satu-satunya perangkat, atau jadi
+# default untuk setiap entri "devices".
+DEVICE_SCHEMA = {
+    "device_id": (config_str, REQUIRED),
+    "device_name": (config_str, ""),
+    "local_ip": (config_str, ""),
+    "tailscale_ip": (config_str, ""),
+    "tailscale_name": (config_str, ""),
+    "port": (config_int, 5555),
+    "priority": (config_priority, ["tailscale", "local-ip", "usb"]),
+    "max_size": (config_int, 1024),
+    "max_fps": (config_int, 0),
+    "video_bit_rate": (config_str, ""),
+    "video_codec": (config_str, ""),
+    "video_encoder": (config_str, ""),
+    "main_display": (config_bool, True),
+    "wake_screen": (config_bool, True),
+    "unlock_pin": (config_pin, ""),
+    "stay_awake": (config_bool, True),
+    "screen_off": (config_bool, False),
+}
+
+# Key encoding yang boleh ditimpa entri "displays"; yang tidak diisi diambil dari perangkat
+DISPLAY_PROFILE_FIELDS = ("max_size", "max_fps", "video_bit_rate", "video_codec", "video_encoder")
+
+# Satu entri "displays" perangkat: sebuah aplikasi di display virtual, di-mirror sebagai sesinya sendiri
+DISPLAY_SCHEMA = {
+    "name": (config_display_name, REQUIRED),
+    "app": (config_str, ""),
+    "display_size": (config_display_size, ""),
+    **{key: (DEVICE_SCHEMA[key][0], None) for key in DISPLAY_PROFILE_FIELDS},
+}
+
+# Mengubah salah satu ini butuh sesi scrcpy baru; sisanya langsung diterapkan
+SESSION_FIELDS = (
+    "device_id", "device_name", "local_ip", "tailscale_ip", "tailscale_name", "port", "priority",
+    "max_size", "max_fps", "video_bit_rate", "video_codec", "video_encoder", "encoder_selection", "display",
+    "stay_awake", "screen_off",
+)
+
+def validate_section(data, schema, where, problems):
+    """Parse every schema key of data, collecting problems instead of stopping at the first"""
+    values = {}
+    for key, (parser, default) in schema.items():
+        if key not in data:
+            if default is REQUIRED:
+                problems.append(f"{where}: missing required key '{key}'")
+            else:
+                values[key] = default
+            continue
+        try:
+            values[key] = parser(data[key])
+        except (TypeError, ValueError) as e:
+            problems.append(f"{where}: '{key}' {e}")
+    return values
+
+def check_unknown_keys(data, allowed, where, problems):
+    """Report typos like "tailscale-ip" instead of silently ignoring them"""
+    for key in data:
+        if key not in allowed:
+            hint = difflib.get_close_matches(key, allowed, n=1)
+            suffix = f" (did you mean '{hint[0]}'?)" if hint else ""
+            problems.append(f"{where}: unknown key '{key}'{suffix}")
+
+def validate_displays(entries, where, problems):
+    """Parse a device's "displays" list; names must be unique within the device"""
+    if not isinstance(entries, list):
+        problems.append(f"{where}: 'displays' must be a list")
+        return []
+    displays = []
+    names = set()
+    for index, entry in enumerate(entries):
+        display_where = f"{where}.displays[{index}]"
+        if not isinstance(entry, dict):
+            problems.append(f"{display_where}: expected an object")
+            continue
+        check_unknown_keys(entry, list(DISPLAY_SCHEMA), display_where, problems)
+        display = validate_section(entry, DISPLAY_SCHEMA, display_where, problems)
+        name = display.get("name")
+        if name in names:
+            problems.append(f"{display_where}: display name '{name}' is listed twice")
+        elif name:
+            names.add(name)
+        displays.append(display)
+    return displays
+
+class DeviceConfig:
+    """Validated settings for one session: a device's own screen, or one of its virtual displays"""
+
+    # {"name", "app", "display_size"} untuk sesi display virtual
+    display = None
+
+    def __init__(self, values):
+        self.values = values
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    @property
+    def key(self):
+        """Name shown in the dashboard"""
+        name = self.device_name or self.device_id
+        return f"{name}/{self.display['name']}" if self.display else name
+
+    @property
+    def pipeline_id(self):
+        """Unique per session: the device id, plus @name for a virtual display"""
+        return f"{self.device_id}@{self.display['name']}" if self.display else self.device_id
+
+    def changed_fields(self, other):
+        return {key for key, value in self.values.items() if other.values.get(key) != value}
+
+class ToolkitConfig:
+    """Typed view of config.json, validated once when loaded"""
+
+    def __init__(self, settings, devices):
+        self.settings = settings
+        self.devices = devices
+        for key, value in settings.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def load(cls, config_file, registry=None):
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            print(f"{Colors.SUCCESS}✅ Konfigurasi berhasil dimuat{Colors.RESET}")
-            return config
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError([str(e)])
+        if not isinstance(data, dict):
+            raise ConfigError(["top level must be a JSON object"])
+
+        problems = []
+        check_unknown_keys(data, list(SETTINGS_SCHEMA) + list(DEVICE_SCHEMA) + ["devices", "displays"], "config", problems)
+        settings = validate_section(data, SETTINGS_SCHEMA, "config", problems)
+
+        defaults = {key: value for key, value in data.items() if key in DEVICE_SCHEMA or key == "displays"}
+        entries = data.get("devices")
+        if entries is None:
+            entries = [{}]
+        elif not isinstance(entries, list) or not entries:
+            problems.append("config: 'devices' must be a non-empty list")
+            entries = []
+
+        devices = []
+        device_ids = []
+        for index, entry in enumerate(entries):
+            where = f"devices[{index}]" if "devices" in data else "config"
+            if not isinstance(entry, dict):
+                problems.append(f"{where}: expected an object")
+                continue
+            check_unknown_keys(entry, list(DEVICE_SCHEMA) + ["displays"], where, problems)
+            entry = dict(defaults, **entry)
+            values = validate_section(entry, DEVICE_SCHEMA, where, problems)
+            displays = validate_displays(entry.get("displays", []), where, problems)
+            if registry is not None and values.get("device_id"):
+                registry.fill_device_config(values)
+
+            # Setiap metode wireless di daftar prioritas butuh alamatnya
+            # (peer Tailscale juga bisa dicari dari namanya)
+            if "tailscale" in values.get("priority", []) and not (values.get("tailscale_ip") or values.get("tailscale_name")):
+                problems.append(f"{where}: priority uses 'tailscale' but 'tailscale_ip' and 'tailscale_name' are empty")
+            if "local-ip" in values.get("priority", []) and not values.get("local_ip"):
+                problems.append(f"{where}: priority uses 'local-ip' but 'local_ip' is empty")
+
+            if not values.get("main_display", True) and not displays:
+                problems.append(f"{where}: 'main_display' is false but no 'displays' are set")
+
+            # Satu sesi per layar: layar ponsel itu sendiri, lalu tiap display virtual
+            device_ids.append(values.get("device_id"))
+            values = dict(settings, **values)
+            if values.get("main_display", True):
+                devices.append(DeviceConfig(values))
+            for display in displays:
+                overrides = {key: display[key] for key in DISPLAY_PROFILE_FIELDS if display.get(key) is not None}
+                session = {key: display[key] for key in ("name", "app", "display_size") if key in display}
+                devices.append(DeviceConfig(dict(values, display=session, **overrides)))
+
+        # Worker process tidak punya terminal untuk membaca Enter
+        if settings.get("worker_processes") and settings.get("upgrade_policy") == "confirm":
+            problems.append("config: upgrade_policy 'confirm' does not work with worker_processes")
+        if settings.get("scrcpy_memory_limit") and not hasattr(resource, "prlimit"):
+            problems.append("config: 'scrcpy_memory_limit' is not supported on this platform")
+        if settings.get("session_handoff") and os.name != "posix":
+            problems.append("config: 'session_handoff' is not supported on this platform")
+        if settings.get("session_handoff") and settings.get("worker_processes"):
+            problems.append("config: session_handoff does not work with worker_processes")
+
+        seen = set()
+        for device_id in device_ids:
+            if device_id in seen:
+                problems.append(f"config: device_id '{device_id}' is listed twice")
+            seen.add(device_id)
+
+        if problems:
+            raise ConfigError(problems)
+        return cls(settings, devices)
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    serial TEXT PRIMARY KEY,
+    model TEXT,
+    brand TEXT,
+    device_name TEXT,
+    android_version TEXT,
+    last_path TEXT,
+    last_target TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    serial TEXT NOT NULL,
+    address TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    last_seen REAL,
+    PRIMARY KEY (serial, address)
+);
+CREATE INDEX IF NOT EXISTS addresses_by_address ON addresses (address);
+CREATE TABLE IF NOT EXISTS connections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    serial TEXT NOT NULL,
+    path TEXT,
+    target TEXT,
+    started_at REAL,
+    ended_at REAL,
+    return_code INTEGER
+);
+CREATE INDEX IF NOT EXISTS connections_by_serial ON connections (serial, started_at);
+CREATE TABLE IF NOT EXISTS encoders (
+    serial TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    encoder TEXT NOT NULL,
+    method TEXT,
+    startup_ms INTEGER,
+    updated_at REAL
+);
+"""
+
+class DeviceRegistry:
+    """Local SQLite store of known devices, their addresses and connection history"""
+
+    def __init__(self, path=DEVICE_REGISTRY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock, self.db:
+            self.db.executescript(REGISTRY_SCHEMA)
+
+    def record_device(self, serial, details):
+        """Insert or refresh the properties of a device"""
+        # INSERT OR IGNORE + UPDATE, bukan upsert, karena SQLite versi lama belum punya
+        with self.lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO devices (serial) VALUES (?)", (serial,))
+            self.db.execute(
+                """UPDATE devices SET model = ?, brand = ?, device_name = ?, android_version = ?, updated_at = ?
+                   WHERE serial = ?""",
+                (details.get('model'), details.get('brand'), details.get('device_name'),
+                 details.get('android_version'), time.time(), serial)
+            )
+
+    def record_address(self, serial, address, kind):
+        """Remember an address (kind: "lan" or "tailscale"), replacing older ones of that kind"""
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM addresses WHERE serial = ? AND kind = ? AND address != ?", (serial, kind, address))
+            self.db.execute(
+                "INSERT OR REPLACE INTO addresses (serial, address, kind, last_seen) VALUES (?, ?, ?, ?)",
+                (serial, address, kind, time.time())
+            )
+
+    def get_device(self, serial):
+        """Known device with its addresses as {kind: address}, or None"""
+        with self.lock:
+            row = self.db.execute("SELECT * FROM devices WHERE serial = ?", (serial,)).fetchone()
+            if row is None:
+                return None
+            addresses = self.db.execute("SELECT kind, address FROM addresses WHERE serial = ?", (serial,)).fetchall()
+        device = dict(row)
+        device['addresses'] = {address['kind']: address['address'] for address in addresses}
+        return device
+
+    def find_by_address(self, address):
+        """Serial of the device last seen at an IP (with or without :port)"""
+        ip = address.split(':')[0]
+        with self.lock:
+            row = self.db.execute(
+                "SELECT serial FROM addresses WHERE address = ? ORDER BY last_seen DESC LIMIT 1", (ip,)
+            ).fetchone()
+        return row['serial'] if row else None
+
+    def fill_device_config(self, values):
+        """Fill addresses and name left empty in config.json from what the registry knows"""
+        known = self.get_device(values["device_id"])
+        if known is None:
+            return
+        for key, kind in (("local_ip", "lan"), ("tailscale_ip", "tailscale")):
+            if not values.get(key) and known['addresses'].get(kind):
+                values[key] = known['addresses'][kind]
+        if not values.get("device_name") and known['model']:
+            # adb devices -l menampilkan model dengan underscore
+            values["device_name"] = known['model'].replace(' ', '_')
+
+    def record_connection_start(self, serial, path, target):
+        """Log the start of a session and remember it as the last good path"""
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO devices (serial, updated_at) VALUES (?, ?)", (serial, now))
+            self.db.execute(
+                "UPDATE devices SET last_path = ?, last_target = ? WHERE serial = ?", (path, target, serial)
+            )
+            cursor = self.db.execute(
+                "INSERT INTO connections (serial, path, target, started_at) VALUES (?, ?, ?, ?)",
+                (serial, path, target, now)
+            )
+            return cursor.lastrowid
+
+    def record_connection_end(self, connection_id, return_code):
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE connections SET ended_at = ?, return_code = ? WHERE id = ?",
+                (time.time(), return_code, connection_id)
+            )
+
+    def get_history(self, serial, limit=20):
+        """Most recent sessions of a device, newest first"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT * FROM connections WHERE serial = ? ORDER BY started_at DESC LIMIT ?", (serial, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_encoder(self, serial):
+        """Cached video encoder choice of a device, or None"""
+        with self.lock:
+            row = self.db.execute("SELECT * FROM encoders WHERE serial = ?", (serial,)).fetchone()
+        return dict(row) if row else None
+
+    def record_encoder(self, serial, codec, encoder, method, startup_ms=None):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO encoders (serial, codec, encoder, method, startup_ms, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (serial, codec, encoder, method, startup_ms, time.time())
+            )
+
+    def forget_encoder(self, serial):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM encoders WHERE serial = ?", (serial,))
+
+# Socket LocalAPI default tailscaled di Linux
+TAILSCALE_SOCKETS = ("/var/run/tailscale/tailscaled.sock", "/run/tailscale/tailscaled.sock")
+
+# Berapa detik jawaban status tailscaled dipakai ulang; pemilihan jalur sering menanyakannya
+TAILSCALE_STATUS_TTL = 5
+
+class TailscaleResolver:
+    """Peer state from the local tailscaled: online, current IP, direct or DERP-relayed"""
+
+    def __init__(self, socket_path=""):
+        self.socket_paths = [socket_path] if socket_path else list(TAILSCALE_SOCKETS)
+        self.lock = threading.Lock()
+        self.status = None
+        self.fetched_at = 0
+
+    def query_local_api(self):
+        """GET /localapi/v0/status over the tailscaled unix socket"""
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        for socket_path in self.socket_paths:
+            if not os.path.exists(socket_path):
+                continue
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(2)
+                    sock.connect(socket_path)
+                    # HTTP/1.0 supaya body tidak chunked dan koneksi tidak keep-alive
+                    sock.sendall(
+                        b"GET /localapi/v0/status HTTP/1.0\r\n"
+                        b"Host: local-tailscaled.sock\r\n"
+                        b"Sec-Tailscale: localapi\r\n\r\n"
+                    )
+                    chunks = []
+                    while True:
+                        chunk = sock.recv(65536)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+            except OSError:
+                continue
+
+            head, _, body = b"".join(chunks).partition(b"\r\n\r\n")
+            if b" 200 " not in head.split(b"\r\n", 1)[0]:
+                continue
+            try:
+                return json.loads(body.decode('utf-8'))
+            except ValueError:
+                continue
+        return None
+
+    def query_cli(self):
+        """Fallback for systems without the socket (Windows, macOS app)"""
+        try:
+            result = subprocess.run(
+                ["tailscale", "status", "--json"], capture_output=True, text=True, timeout=3
+            )
+            return json.loads(result.stdout) if result.returncode == 0 else None
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            return None
+
+    def get_status(self):
+        """Cached tailscaled status, or None when Tailscale is not available"""
+        with self.lock:
+            if time.time() - self.fetched_at > TAILSCALE_STATUS_TTL:
+                self.status = self.query_local_api() or self.query_cli()
+                self.fetched_at = time.time()
+            return self.status
+
+    def find_peer(self, name="", ip=""):
+        """Look a peer up by hostname/MagicDNS name, then by Tailscale IP"""
+        status = self.get_status()
+        if not status:
+            return None
+
+        peers = list((status.get("Peer") or {}).values())
+        match = None
+        if name:
+            wanted = name.lower().rstrip('.')
+            for peer in peers:
+                dns_name = (peer.get("DNSName") or "").lower().rstrip('.')
+                if wanted in ((peer.get("HostName") or "").lower(), dns_name, dns_name.split('.')[0]):
+                    match = peer
+                    break
+        if match is None and ip:
+            match = next((peer for peer in peers if ip in (peer.get("TailscaleIPs") or [])), None)
+        if match is None:
+            return None
+
+        ipv4 = [address for address in match.get("TailscaleIPs") or [] if '.' in address]
+        return {
+            'hostname': match.get("HostName"),
+            'online': bool(match.get("Online")),
+            'ip': ipv4[0] if ipv4 else ip,
+            # CurAddr adalah endpoint langsung peer; kosong berarti trafik lewat relay DERP
+            'direct': bool(match.get("CurAddr")),
+            'relay': match.get("Relay") or "",
+        }
+
+class SessionJournal:
+    """Append-only JSONL record of one device's connections, rotated by size"""
+
+    def __init__(self, device_id, max_bytes=1024 * 1024, backups=3, directory=JOURNAL_DIR):
+        safe_name = re.sub(r"[^A-Za-z0-9@._-]", "_", device_id)
+        self.path = os.path.join(directory, f"{safe_name}.jsonl")
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+
+    def record(self, event, **fields):
+        if not self.max_bytes:
+            return
+        entry = dict(t=round(time.time(), 3), event=event, **fields)
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self.lock:
+            # Jurnal hanya alat bantu diagnosa; disk penuh tidak boleh menghentikan mirroring
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self.rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError:
+                pass
+
+    def rotate(self):
+        """device.jsonl -> device.jsonl.1 -> ... -> device.jsonl.<backups>, the oldest is dropped"""
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+# Kelas perintah adb, yang paling mendesak dulu
+ADB_PRIORITY_STATUS = 0
+ADB_PRIORITY_NORMAL = 1
+ADB_PRIORITY_HEAVY = 2
+
+# Query baca-saja: murah, dan yang identik dan masih mengantre bisa berbagi satu jawaban
+ADB_STATUS_COMMANDS = ("devices", "get-state", "shell getprop", "shell echo", "shell ip")
+ADB_HEAVY_COMMANDS = ("push", "install", 'shell "md5sum')
+
+def classify_adb_command(cmd):
+    """Return (priority, serial, shareable) for an adb command line"""
+    args = cmd.split()[1:]
+    serial = None
+    if len(args) >= 2 and args[0] == "-s":
+        serial = args[1]
+        args = args[2:]
+    elif len(args) >= 2 and args[0] in ("connect", "disconnect"):
+        serial = args[1]
+
+    command = " ".join(args)
+    if command.startswith(ADB_STATUS_COMMANDS):
+        return ADB_PRIORITY_STATUS, serial, True
+    if command.startswith(ADB_HEAVY_COMMANDS):
+        return ADB_PRIORITY_HEAVY, serial, False
+    return ADB_PRIORITY_NORMAL, serial, False
+
+class AdbScheduler:
+    """Admit adb commands so many devices do not overwhelm the single adb server"""
+
+    def __init__(self, limit=4, gate=None):
+        self.limit = max(limit, 1)
+        # Semaphore opsional yang dibagi dengan proses lain, untuk mode worker
+        self.gate = gate
+        self.condition = threading.Condition()
+        # {server_port: perintah yang berjalan}; None adalah server adb default
+        self.running = {}
+        self.busy_serials = set()
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.in_flight = {}
+
+    def resize(self, limit):
+        with self.condition:
+            self.limit = max(limit, 1)
+            self.condition.notify_all()
+
+    def run(self, cmd, timeout=None, stdout=None, server_port=None):
+        """Run a command line like subprocess.run, once the scheduler admits it
+
+        With stdout (an open file) the output goes straight into it instead of being captured.
+        With server_port, adb (and scrcpy's adb) talk to that adb server instead of the default one.
+        """
+        priority, serial, shareable = classify_adb_command(cmd)
+        if not shareable or stdout is not None:
+            return self.execute(cmd, timeout, priority, serial, stdout, server_port)
+
+        # Query identik ke server yang sama yang masih mengantre sekaligus menjawab yang ini
+        key = (server_port, cmd)
+        with self.condition:
+            request = self.in_flight.get(key)
+            owner = request is None
+            if owner:
+                request = self.in_flight[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not owner:
+            request["done"].wait()
+            if request["error"]:
+                raise request["error"]
+            return request["result"]
+
+        def started():
+            # Begitu berjalan, query yang datang belakangan tidak boleh mendapat jawaban yang dibaca sebelum ia ditanyakan
+            if self.in_flight.get(key) is request:
+                del self.in_flight[key]
+
+        try:
+            request["result"] = self.execute(cmd, timeout, priority, serial, server_port=server_port, on_start=started)
+            return request["result"]
         except Exception as e:
-            print(f"{Colors.ERROR}❌ Gagal memuat konfigurasi: {e}{Colors.RESET}")
-            sys.exit(1)
-    
-    def setup_environment(self):
-        """Setup scrcpy environment and PATH"""
-        scrcpy_folder = self.config.get("scrcpy_folder", "scrcpy-win64-v3.2")
-        
-        if os.path.exists(scrcpy_folder):
-            os.chdir(scrcpy_folder)
-            # Add current directory to PATH for adb and scrcpy
-            os.environ['PATH'] = os.getcwd() + os.pathsep + os.environ['PATH']
-            print(f"{Colors.SUCCESS}✅ Environment scrcpy disetup di: {os.getcwd()}{Colors.RESET}")
+            request["error"] = e
+            raise
+        finally:
+            with self.condition:
+                started()
+            request["done"].set()
+
+    def execute(self, cmd, timeout, priority, serial, stdout=None, server_port=None, on_start=None):
+        if stdout is None:
+            output = {"capture_output": True}
         else:
-            print(f"{Colors.ERROR}❌ Folder scrcpy tidak ditemukan: {scrcpy_folder}{Colors.RESET}")
-            sys.exit(1)
+            output = {"stdout": stdout, "stderr": subprocess.PIPE}
+
+        with self.slot(priority, serial, server_port, on_start):
+            return subprocess.run(cmd, shell=True, text=True, timeout=timeout, env=adb_server_env(server_port), **output)
+
+    @contextlib.contextmanager
+    def admitted(self, cmd, server_port=None):
+        """Hold the slot cmd would get, for callers that drive an adb process themselves"""
+        priority, serial, _ = classify_adb_command(cmd)
+        with self.slot(priority, serial, server_port):
+            yield
+
+    @contextlib.contextmanager
+    def slot(self, priority, serial, server_port=None, on_start=None):
+        # Slot dan perangkat sibuk dihitung per server adb, supaya server yang macet tidak menahan yang lain
+        entry = (priority, next(self.sequence), serial, server_port)
+        with self.condition:
+            self.waiting.append(entry)
+            self.condition.wait_for(lambda: self.is_next(entry))
+            self.waiting.remove(entry)
+            self.running[server_port] = self.running.get(server_port, 0) + 1
+            if serial:
+                self.busy_serials.add((server_port, serial))
+            if on_start:
+                on_start()
+
+        try:
+            if self.gate:
+                with self.gate:
+                    yield
+            else:
+                yield
+        finally:
+            with self.condition:
+                self.running[server_port] -= 1
+                self.busy_serials.discard((server_port, serial))
+                self.condition.notify_all()
+
+    def is_next(self, entry):
+        """A free slot, a free device, and no more urgent command that could run instead"""
+        server_port = entry[3]
+        if self.running.get(server_port, 0) >= self.limit or (server_port, entry[2]) in self.busy_serials:
+            return False
+        runnable = [
+            other for other in self.waiting
+            if other[3] == server_port and (server_port, other[2]) not in self.busy_serials
+        ]
+        return min(runnable) == entry
+
+# Titik per server adb di hash ring; makin banyak titik makin rata sebaran perangkatnya
+ADB_SHARD_REPLICAS = 64
+ADB_SHARD_CHECK_INTERVAL = 10
+ADB_SHARD_CHECK_TIMEOUT = 5
+# Cek gagal berturut-turut sebelum perangkat sebuah server dipindah, cek lolos sebelum dikembalikan
+ADB_SHARD_FAILURES = 2
+ADB_SHARD_RECOVERIES = 3
+
+def adb_server_env(server_port):
+    """Environment that points adb at the server on server_port; None inherits the default"""
+    if server_port is None:
+        return None
+    return dict(os.environ, ANDROID_ADB_SERVER_PORT=str(server_port))
+
+def shard_hash(text):
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "big")
+
+class AdbShards:
+    """Several adb servers, with devices spread over them by consistent hashing
+
+    A server that stops answering hands its devices to the next servers on the ring until it
+    recovers. Devices of the other servers never move.
+    """
+
+    def __init__(self, ports, ui):
+        self.ports = list(ports)
+        self.ui = ui
+        self.ring = sorted(
+            (shard_hash(f"{port}#{replica}"), port) for port in self.ports for replica in range(ADB_SHARD_REPLICAS)
+        )
+        self.healthy = set(self.ports)
+        self.failures = dict.fromkeys(self.ports, 0)
+        self.recoveries = dict.fromkeys(self.ports, 0)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.on_change = None
+
+    def port_for(self, device_id):
+        """The first healthy server clockwise from the device's point on the ring"""
+        with self.lock:
+            healthy = self.healthy or set(self.ports)
+        start = bisect.bisect(self.ring, (shard_hash(device_id),))
+        for index in range(len(self.ring)):
+            port = self.ring[(start + index) % len(self.ring)][1]
+            if port in healthy:
+                return port
+
+    def adb(self, port, *args, timeout=ADB_SHARD_CHECK_TIMEOUT):
+        """Run adb against one server directly, past the scheduler that a wedged server may clog"""
+        try:
+            result = subprocess.run(
+                ["adb", *args], env=adb_server_env(port), stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, timeout=timeout
+            )
+            return result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    def start(self):
+        for port in self.ports:
+            if not self.adb(port, "start-server", timeout=15):
+                self.ui.log(f"{Colors.WARNING}⚠️  Server adb :{port} gagal start{Colors.RESET}")
+        self.ui.log(f"{Colors.SUCCESS}✅ {len(self.ports)} server adb di port {self.ports[0]}-{self.ports[-1]}{Colors.RESET}")
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        while not self.stop_event.wait(ADB_SHARD_CHECK_INTERVAL):
+            self.check()
+
+    def check(self):
+        """Ask every server for its device list; move devices off the ones that stay silent"""
+        changed = False
+        failed = []
+        for port in self.ports:
+            ok = self.adb(port, "devices")
+            with self.lock:
+                self.failures[port] = 0 if ok else self.failures[port] + 1
+                self.recoveries[port] = self.recoveries[port] + 1 if ok else 0
+                if port in self.healthy and self.failures[port] >= ADB_SHARD_FAILURES:
+                    self.healthy.discard(port)
+                    changed = True
+                    self.ui.log(f"{Colors.ERROR}🚑 Server adb :{port} tidak menjawab - memindahkan perangkatnya{Colors.RESET}")
+                elif port not in self.healthy and self.recoveries[port] >= ADB_SHARD_RECOVERIES:
+                    self.healthy.add(port)
+                    changed = True
+                    self.ui.log(f"{Colors.SUCCESS}✅ Server adb :{port} pulih - mengembalikan perangkatnya{Colors.RESET}")
+                if port not in self.healthy and not ok:
+                    failed.append(port)
+
+        # Perangkat dulu, supaya tidak ada yang masih mirroring lewat server yang sedang restart
+        if changed and self.on_change:
+            self.on_change()
+        for port in failed:
+            self.ui.log(f"{Colors.WARNING}↳ Me-restart server adb :{port}...{Colors.RESET}")
+            self.adb(port, "kill-server")
+            self.adb(port, "start-server", timeout=15)
+
+# Maksimal redraw per detik; update yang datang di antaranya digabung ke frame berikutnya
+DASHBOARD_REFRESH_RATE = 4
+
+# Field status yang layak dapat baris sendiri saat stdout bukan terminal
+DASHBOARD_LOG_FIELDS = ("state", "path", "target")
+
+class Dashboard:
+    """Render log lines and a per-device status table off the main thread"""
+
+    def __init__(self, stream=None, refresh_rate=DASHBOARD_REFRESH_RATE):
+        self.stream = stream or sys.stdout
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.frame_interval = 1.0 / refresh_rate
+        self.lock = threading.Lock()
+        self.render_lock = threading.Lock()
+        self.pending_lines = []
+        self.devices = {}
+        self.changed_devices = set()
+        self.table_height = 0
+        self.wake_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def log(self, message=""):
+        """Queue a log line; never blocks on the terminal"""
+        with self.lock:
+            self.pending_lines.append(message)
+        self.wake_event.set()
+
+    def update(self, device, **fields):
+        """Merge status fields for a device; unchanged values cost nothing"""
+        with self.lock:
+            status = self.devices.setdefault(device, {})
+            changed = {key: value for key, value in fields.items() if status.get(key) != value}
+            if not changed:
+                return
+            status.update(changed)
+            if self.interactive or any(key in DASHBOARD_LOG_FIELDS for key in changed):
+                self.changed_devices.add(device)
+        self.wake_event.set()
+
+    def remove(self, device):
+        """Drop a device row, e.g. after it was removed from the config"""
+        with self.lock:
+            if self.devices.pop(device, None) is not None:
+                self.changed_devices.add(device)
+        self.wake_event.set()
+
+    def run(self):
+        while True:
+            self.wake_event.wait()
+            self.wake_event.clear()
+            self.flush()
+            # Rate limit: semua yang antre selama sleep masuk ke satu frame
+            time.sleep(self.frame_interval)
+
+    def flush(self):
+        """Write everything queued so far as a single frame"""
+        with self.render_lock:
+            with self.lock:
+                lines = self.pending_lines
+                self.pending_lines = []
+                changed_devices = self.changed_devices
+                self.changed_devices = set()
+                devices = {device: dict(status) for device, status in self.devices.items()}
+
+            if not lines and not changed_devices:
+                return
+
+            if self.interactive:
+                frame = self.render_interactive(lines, devices)
+            else:
+                frame = self.render_plain(lines, changed_devices, devices)
+
+            try:
+                self.stream.write(frame)
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+
+    def render_interactive(self, lines, devices):
+        """Logs scroll above, the status table is redrawn in place below them"""
+        frame = []
+        if self.table_height:
+            # Lompat ke baris pertama tabel dan hapus tabel lama
+            frame.append(f"\033[{self.table_height}F\033[J")
+        frame.extend(line + "\n" for line in lines)
+
+        table = self.format_table(devices)
+        frame.extend(row + "\n" for row in table)
+        self.table_height = len(table)
+        return "".join(frame)
+
+    def render_plain(self, lines, changed_devices, devices):
+        """One line per state change, no cursor movement"""
+        frame = [line + "\n" for line in lines]
+        for device in changed_devices:
+            if device not in devices:
+                continue
+            status = devices[device]
+            details = " ".join(f"{key}={status[key]}" for key in DASHBOARD_LOG_FIELDS if status.get(key))
+            frame.append(f"[{device}] {details}\n")
+        return "".join(frame)
+
+    def format_table(self, devices):
+        """Per-device status rows"""
+        if not devices:
+            return []
+
+        state_colors = {
+            "mirroring": Colors.SUCCESS,
+            "connected": Colors.SUCCESS,
+            "reconnecting": Colors.WARNING,
+            "switching": Colors.WARNING,
+            "offline": Colors.ERROR,
+        }
+        rows = [f"{Colors.DIM}╔══════════════════════════════════════════╗{Colors.RESET}"]
+        for device, status in devices.items():
+            state = status.get("state", "-")
+            state_color = state_colors.get(state, Colors.PRIMARY)
+            details = []
+            if status.get("path"):
+                details.append(f"{status['path']} {Colors.DEVICE}{status.get('target', '')}{Colors.RESET}")
+            if status.get("fps") is not None:
+                details.append(f"{Colors.PORT}{status['fps']} fps{Colors.RESET}")
+            if status.get("latency") is not None:
+                details.append(f"{Colors.PORT}{status['latency']:.0f} ms{Colors.RESET}")
+            if status.get("sessions"):
+                details.append(f"#{status['sessions']}")
+            if status.get("note"):
+                details.append(f"{Colors.DIM}{status['note']}{Colors.RESET}")
+            rows.append(
+                f"{Colors.DIM}║{Colors.RESET} 📱 {Colors.BOLD}{device}{Colors.RESET} "
+                f"{state_color}{state}{Colors.RESET} {' • '.join(details)}"
+            )
+        rows.append(f"{Colors.DIM}╚══════════════════════════════════════════╝{Colors.RESET}")
+        return rows
+
+class SessionWatchdog:
+    """Kill a scrcpy session whose stream froze while the process stayed alive"""
+
+    def __init__(self, manager, device_ip, process):
+        self.manager = manager
+        self.device_ip = device_ip
+        self.process = process
+        self.stall_timeout = manager.config.watchdog_timeout
+        self.interval = max(manager.config.watchdog_interval, 1)
+        self.started_at = time.time()
+        self.last_fps_at = None
+        self.last_fps = None
+        self.idle_since = None
+        self.link_down_since = None
+        self.stalled = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def feed(self, line):
+        """Record liveness from a raw scrcpy output line"""
+        match = FPS_PATTERN.search(line)
+        if match:
+            self.last_fps_at = time.time()
+            self.last_fps = int(match.group(1))
+            self.manager.ui.update(self.manager.device_key, fps=self.last_fps)
+            if self.last_fps > 0:
+                self.idle_since = None
+            elif self.idle_since is None:
+                self.idle_since = self.last_fps_at
+
+    def is_idle(self, seconds):
+        """True when the screen has not changed for the given number of seconds"""
+        return self.idle_since is not None and time.time() - self.idle_since >= seconds
+
+    def check_link(self):
+        """Ask the adb server for the transport state, then ping the device itself"""
+        state = self.manager.run_command(
+            f"adb -s {self.device_ip} get-state", silent=True, timeout=self.interval
+        ).strip()
+        if state != "device":
+            return False
+        return self.manager.ping_device(self.device_ip, timeout=self.interval) is not None
+
+    def get_stall_reason(self, now):
+        """Return why the session counts as stalled, or None if it is healthy"""
+        if self.link_down_since is not None and now - self.link_down_since >= self.stall_timeout:
+            return "link"
+
+        # scrcpy mencetak fps tiap detik (bahkan "0 fps" saat layar diam),
+        # jadi kalau sepi berarti client-nya sendiri macet. Beri waktu ekstra saat startup.
+        if self.last_fps_at is not None:
+            if now - self.last_fps_at >= self.stall_timeout:
+                return "fps"
+        elif now - self.started_at >= self.stall_timeout * 2:
+            return "fps"
+
+        return None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            if self.process.poll() is not None:
+                return
+
+            if self.check_link():
+                self.link_down_since = None
+            elif self.link_down_since is None:
+                self.link_down_since = time.time()
+
+            reason = self.get_stall_reason(time.time())
+            if reason and not self.stop_event.is_set():
+                self.stalled = reason
+                if reason == "link":
+                    self.manager.ui.log(f"\n{Colors.WARNING}🧊 Perangkat tidak terjangkau selama {self.stall_timeout}s - memulai ulang sesi...{Colors.RESET}")
+                else:
+                    self.manager.ui.log(f"\n{Colors.WARNING}🧊 Stream membeku selama {self.stall_timeout}s - memulai ulang sesi...{Colors.RESET}")
+                self.manager.stop_process(self.process)
+                return
+
+class PathUpgradeMonitor:
+    """Look for a faster path while mirroring and switch over per upgrade_policy"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.candidate = None
+        self.prompting = False
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def find_faster_path(self):
+        """Return the best path ranked above the current one that is up and not slower"""
+        current_target = self.manager.active_target
+        current_rank = PATH_RANK.get(self.manager.active_type, len(PATH_RANK))
+        current_latency = self.manager.path_latency.get(current_target)
+
+        methods = sorted(self.manager.get_connection_methods(), key=lambda method: PATH_RANK.get(method[2], len(PATH_RANK)))
+        for connection_name, connection_target, connection_type in methods:
+            if not connection_target or PATH_RANK.get(connection_type, len(PATH_RANK)) >= current_rank:
+                continue
+            if not self.manager.bring_up_path(connection_target, connection_type):
+                continue
+
+            latency = self.manager.ping_device(connection_target, timeout=2)
+            if latency is None:
+                continue
+            if current_latency is None or latency <= current_latency:
+                return connection_name, connection_target, connection_type
+
+        return None
+
+    def ask_confirmation(self):
+        """Wait for Enter on a background thread, then switch"""
+        if self.prompting:
+            return
+        self.prompting = True
+        self.manager.ui.log(f"{Colors.PRIMARY}   ↳ Tekan Enter untuk pindah{Colors.RESET}")
+
+        def wait_for_enter():
+            try:
+                input()
+            except (EOFError, OSError):
+                return
+            self.prompting = False
+            if self.candidate and not self.stop_event.is_set():
+                self.manager.request_switch(self.candidate)
+
+        threading.Thread(target=wait_for_enter, daemon=True).start()
+
+    def run(self):
+        # Policy dan interval dibaca tiap putaran supaya perubahan config langsung berlaku
+        while not self.stop_event.wait(max(self.manager.config.upgrade_check_interval, 1)):
+            policy = self.manager.config.upgrade_policy
+            if policy == "off" or self.manager.pending_switch:
+                continue
+
+            candidate = self.find_faster_path()
+            if candidate is None:
+                self.candidate = None
+                continue
+
+            if candidate != self.candidate:
+                self.manager.ui.log(f"\n{Colors.SUCCESS}⚡ Jalur lebih cepat tersedia: {candidate[0]} ({candidate[1]}){Colors.RESET}")
+            self.candidate = candidate
+
+            if policy == "confirm":
+                self.ask_confirmation()
+                continue
+            if policy == "idle":
+                watchdog = self.manager.active_watchdog
+                if watchdog is None or not watchdog.is_idle(UPGRADE_IDLE_SECONDS):
+                    continue
+
+            self.manager.request_switch(candidate)
+
+class TransportKeepalive:
+    """Heartbeat the standby wireless transports so NAT and idle timeouts do not drop them"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.alive = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def beat(self):
+        states = self.manager.get_device_states()
+        for connection_name, connection_target, connection_type in self.manager.get_connection_methods():
+            # Watchdog sesi sudah mengecek transport yang aktif
+            if connection_type == "usb" or not connection_target or connection_target == self.manager.active_target:
+                continue
+            # Cadangan di sini, tapi sesi lain dari ponsel ini mirroring lewat jalur itu: watchdog-nya yang bertanggung jawab
+            if connection_target in self.manager.sibling_targets():
+                continue
+
+            if states.get(connection_target) == "device":
+                alive = self.manager.ping_device(connection_target, timeout=2) is not None
+                if alive:
+                    self.manager.heartbeats[connection_target] = time.time()
+                else:
+                    self.manager.heartbeats.pop(connection_target, None)
+                    # Transport yang terus tidak merespons diputus, supaya failover menyambung ulang
+                    # dan tidak mempercayainya; satu ping yang gagal hanya gangguan sesaat
+                    if self.alive.get(connection_target) is False:
+                        self.drop(connection_target)
+            else:
+                # Terputus sementara itu - sambungkan lagi sebelum dibutuhkan
+                alive = self.manager.bring_up_path(connection_target, connection_type)
+                if alive:
+                    self.manager.heartbeats[connection_target] = time.time()
+
+            if alive != self.alive.get(connection_target, alive):
+                if alive:
+                    self.manager.ui.log(f"{Colors.SUCCESS}💓 {connection_name} transport cadangan kembali ({connection_target}){Colors.RESET}")
+                else:
+                    self.manager.ui.log(f"{Colors.WARNING}💔 {connection_name} transport cadangan berhenti merespons ({connection_target}){Colors.RESET}")
+            self.alive[connection_target] = alive
+
+    def drop(self, connection_target):
+        with CONNECT_LOCKS[self.manager.config.device_id]:
+            # Dicek lagi di dalam lock: sesi saudaranya mungkin sudah mulai mirroring lewat jalur itu
+            if connection_target not in self.manager.sibling_targets():
+                self.manager.run_command(f"adb disconnect {connection_target}", silent=True)
+
+    def run(self):
+        # Interval dibaca tiap putaran supaya perubahan config langsung berlaku; 0 menghentikan heartbeat
+        while not self.stop_event.wait(max(self.manager.config.keepalive_interval, 1)):
+            if self.manager.config.keepalive_interval and not self.manager.pending_switch:
+                self.beat()
+
+# "    --video-codec=h264 --video-encoder=c2.mtk.avc.encoder    (hw) [vendor]"
+ENCODER_PATTERN = re.compile(r"--video-codec=(\S+)\s+--video-encoder=(\S+)(.*)")
+# Yang paling ringan di-decode di komputer lebih dulu
+VIDEO_CODECS = ("h264", "h265", "av1")
+# Benchmark: berapa kandidat yang dicoba, dan berapa lama tiap rekaman uji berjalan
+ENCODER_BENCHMARK_CANDIDATES = 4
+ENCODER_BENCHMARK_SECONDS = 3
+
+def parse_encoders(output):
+    """Video encoders from scrcpy --list-encoders, aliases left out"""
+    encoders = []
+    for line in output.split("\n"):
+        match = ENCODER_PATTERN.search(line)
+        if not match:
+            continue
+        codec, encoder, flags = match.groups()
+        if "alias for" in flags:
+            continue
+        encoders.append({"codec": codec, "encoder": encoder, "hardware": "(hw)" in flags})
+    return encoders
+
+def rank_encoders(encoders):
+    """Hardware encoders first, then by codec"""
+    def rank(encoder):
+        codec_rank = VIDEO_CODECS.index(encoder["codec"]) if encoder["codec"] in VIDEO_CODECS else len(VIDEO_CODECS)
+        return (not encoder["hardware"], codec_rank)
+    return sorted(encoders, key=rank)
+
+# Profil sesi dari kualitas penuh sampai paling dingin: (porsi max_size, batas fps)
+THROTTLE_STEPS = ((1.0, 0), (1.0, 30), (0.75, 30), (0.5, 20))
+# Ukuran awal langkah yang diperkecil saat max_size 0 (tanpa batas)
+THROTTLE_BASE_SIZE = 1920
+# Naik kembali satu langkah butuh suhu sekian °C di bawah battery_max_temperature, sekian
+# persen di atas battery_min_level, dan status termal dua di bawah thermal_max_status
+THERMAL_HYSTERESIS = 3
+BATTERY_HYSTERESIS = 5
+# Satu sampel panas langsung turun; sekian sampel dingin berturut-turut untuk naik
+THERMAL_COOL_SAMPLES = 4
+# Sampel yang dilewati setelah satu langkah, supaya profil baru sempat berlaku
+THERMAL_SETTLE_SAMPLES = 2
+
+THERMAL_STATUS_PATTERN = re.compile(r"Thermal Status:\s*(\d+)")
+BATTERY_FIELD_PATTERN = re.compile(r"^\s*(temperature|level|status):\s*(-?\d+)\s*$", re.MULTILINE)
+# BatteryManager.BATTERY_STATUS_CHARGING dan _FULL
+BATTERY_CHARGING_STATES = (2, 5)
+
+def parse_device_health(output):
+    """Thermal status and battery state from dumpsys thermalservice + battery"""
+    health = {}
+    match = THERMAL_STATUS_PATTERN.search(output)
+    if match:
+        health["thermal_status"] = int(match.group(1))
+    battery = {key: int(value) for key, value in BATTERY_FIELD_PATTERN.findall(output)}
+    if "temperature" in battery:
+        # Dilaporkan dalam sepersepuluh derajat
+        health["battery_temperature"] = battery["temperature"] / 10
+    if "level" in battery:
+        health["battery_level"] = battery["level"]
+    if "status" in battery:
+        health["charging"] = battery["status"] in BATTERY_CHARGING_STATES
+    return health
+
+# Screen timeout dalam detik selama sesi stay_awake berjalan; scrcpy mengembalikan yang lama saat keluar
+STAY_AWAKE_TIMEOUT = 86400
+WAKEFULNESS_PATTERN = re.compile(r"mWakefulness=(\w+)")
+# KeyguardServiceDelegate di dumpsys window policy; "showingAndNotOccluded=" tidak boleh cocok
+KEYGUARD_SHOWING_PATTERN = re.compile(r"^\s*showing=(true|false)\s*$", re.MULTILINE)
+
+def parse_screen_state(output):
+    """Whether the screen is on and the keyguard is showing, from dumpsys power + window policy"""
+    state = {}
+    match = WAKEFULNESS_PATTERN.search(output)
+    if match:
+        state["awake"] = match.group(1) == "Awake"
+    match = KEYGUARD_SHOWING_PATTERN.search(output)
+    if match:
+        state["locked"] = match.group(1) == "true"
+    return state
+
+# Satu governor per ponsel, dipakai bersama semua sesinya: {device_id: ThermalGovernor}
+THERMAL_GOVERNORS = {}
+THERMAL_GOVERNORS_LOCK = threading.Lock()
+
+class ThermalGovernor:
+    """Step a phone's sessions down in size and fps while it runs hot, and back up once it cools"""
+
+    def __init__(self, device_id, level=0):
+        self.device_id = device_id
+        self.managers = []
+        self.level = level
+        self.cool_samples = 0
+        self.settle_samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    @classmethod
+    def attach(cls, manager):
+        """The governor of manager's phone; the first session of the phone starts it"""
+        device_id = manager.config.device_id
+        with THERMAL_GOVERNORS_LOCK:
+            governor = THERMAL_GOVERNORS.get(device_id)
+            if governor is None:
+                governor = THERMAL_GOVERNORS[device_id] = cls(device_id, manager.throttle_level)
+                governor.thread.start()
+            else:
+                # Layar ponsel itu sendiri dan display virtualnya memanaskan perangkat yang sama
+                manager.throttle_level = governor.level
+            governor.managers.append(manager)
+        return governor
+
+    def detach(self, manager):
+        """Leave the governor; it stops with the phone's last session"""
+        with THERMAL_GOVERNORS_LOCK:
+            self.managers.remove(manager)
+            if not self.managers:
+                self.stop_event.set()
+                if THERMAL_GOVERNORS.get(self.device_id) is self:
+                    del THERMAL_GOVERNORS[self.device_id]
+
+    def lead(self):
+        """The session health is read through: the phone's own screen first, then any display"""
+        active = [manager for manager in list(self.managers) if manager.active_process and not manager.pending_switch]
+        active.sort(key=lambda manager: bool(manager.config.display))
+        return active[0] if active else None
+
+    def classify(self, health, config):
+        """"hot", "cool", or None in the band between the two"""
+        status = health.get("thermal_status")
+        temperature = health.get("battery_temperature")
+        level = health.get("battery_level")
+        discharging = not health.get("charging", True)
+
+        if status is not None and status >= config.thermal_max_status:
+            return "hot"
+        if temperature is not None and temperature >= config.battery_max_temperature:
+            return "hot"
+        if config.battery_min_level and discharging and level is not None and level <= config.battery_min_level:
+            return "hot"
+
+        if status is not None and status > config.thermal_max_status - 2:
+            return None
+        if temperature is not None and temperature > config.battery_max_temperature - THERMAL_HYSTERESIS:
+            return None
+        if config.battery_min_level and discharging and level is not None and level < config.battery_min_level + BATTERY_HYSTERESIS:
+            return None
+        return "cool"
+
+    def step(self, level, health):
+        """Move every session of the phone to another throttle step"""
+        self.level = level
+        for manager in list(self.managers):
+            manager.set_throttle(level, health)
+
+    def check(self, lead):
+        health = lead.read_device_health(lead.active_target)
+        if not health:
+            return
+        if self.settle_samples:
+            self.settle_samples -= 1
+            return
+
+        state = self.classify(health, lead.config)
+        if state == "hot":
+            self.cool_samples = 0
+            if self.level < len(THROTTLE_STEPS) - 1:
+                self.step(self.level + 1, health)
+                self.settle_samples = THERMAL_SETTLE_SAMPLES
+        elif state == "cool" and self.level > 0:
+            self.cool_samples += 1
+            if self.cool_samples >= THERMAL_COOL_SAMPLES:
+                self.cool_samples = 0
+                self.step(self.level - 1, health)
+                self.settle_samples = THERMAL_SETTLE_SAMPLES
+        else:
+            self.cool_samples = 0
+
+    def interval(self):
+        managers = list(self.managers)
+        return managers[0].config.thermal_check_interval if managers else 0
+
+    def run(self):
+        # Interval dibaca tiap putaran supaya perubahan config langsung berlaku; 0 mematikan throttling
+        while not self.stop_event.wait(max(self.interval(), 1)):
+            if not self.interval():
+                if self.level:
+                    self.step(0, {})
+                continue
+            lead = self.lead()
+            if lead:
+                self.check(lead)
+
+def scrcpy_process_options(config):
+    """Popen options that lower the CPU priority of a scrcpy child on Windows"""
+    if config.scrcpy_nice and os.name == "nt":
+        return {"creationflags": subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+    return {}
+
+def limit_scrcpy_process(pid, config):
+    """Cap the CPU priority and memory of a running scrcpy (POSIX)"""
+    # Diatur dari luar setelah scrcpy berjalan: preexec_fn tidak aman di proses yang punya thread
+    if resource is None:
+        return
+    try:
+        if config.scrcpy_nice:
+            nice = os.getpriority(os.PRIO_PROCESS, 0) + config.scrcpy_nice
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+        if config.scrcpy_memory_limit:
+            memory_limit = config.scrcpy_memory_limit * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except OSError:
+        # scrcpy sudah keluar
+        pass
 
-    def run_command(self, cmd, silent=False):
+def is_scrcpy_process(pid):
+    """True if pid is still a running scrcpy (and not a new process that reused the number)"""
+    try:
+        command = subprocess.run(
+            ["ps", "-o", "command=", "-p", str(pid)], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return "scrcpy" in command
+
+def own_process_group(options):
+    """Popen options that start the child as the leader of a new process group"""
+    if os.name == "nt":
+        return {"creationflags": options.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def kill_process_group(pid):
+    """End a scrcpy started by own_process_group, together with the adb it spawned"""
+    # Pid yang sudah selesai dan dipakai ulang proses lain tidak boleh kena
+    if os.name != "nt" and not is_scrcpy_process(pid):
+        return False
+    try:
+        if os.name == "nt":
+            os.kill(pid, signal.SIGTERM)
+        else:
+            os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        return False
+    return True
+
+# Seberapa sering file output sesi dicek untuk baris baru
+SESSION_OUTPUT_POLL_INTERVAL = 0.2
+# Setelah output sebanyak ini dibaca, file dimulai dari awal lagi, selama apa pun sesinya berjalan
+SESSION_OUTPUT_MAX_BYTES = 1024 * 1024
+
+def session_file_path(pipeline_id, extension):
+    """sessions/<pipeline>.log holds scrcpy's output, sessions/<pipeline>.state what adopting it takes"""
+    safe_name = re.sub(r"[^A-Za-z0-9@._-]", "_", pipeline_id)
+    return os.path.join(SESSIONS_DIR, f"{safe_name}.{extension}")
+
+def write_json_file(path, data):
+    temporary = path + ".tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    # File yang baru setengah tertulis tidak boleh dipakai untuk mengambil alih
+    os.replace(temporary, path)
+
+class SessionOutput:
+    """scrcpy's output read back from a file, so the session does not depend on this process"""
+
+    def __init__(self, path, process, offset=0):
+        self.path = path
+        self.process = process
+        self.file = open(path, "rb")
+        self.file.seek(offset)
+        self.offset = offset
+        self.partial = b""
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def readline(self):
+        """Next line; "" once scrcpy exited and everything is read, or after close()"""
+        while True:
+            with self.lock:
+                if self.closed:
+                    return ""
+                chunk = self.file.readline()
+                self.partial += chunk
+                if chunk.endswith(b"\n"):
+                    return self.take()
+                if not chunk and self.process.poll() is not None:
+                    # Apa pun yang ditulis scrcpy tepat sebelum keluar, bahkan tanpa newline
+                    self.partial += self.file.read()
+                    self.closed = True
+                    return self.take()
+                if not chunk and self.offset >= SESSION_OUTPUT_MAX_BYTES:
+                    self.compact()
+            if not chunk:
+                time.sleep(SESSION_OUTPUT_POLL_INTERVAL)
+
+    def take(self):
+        line, self.partial = self.partial, b""
+        self.offset += len(line)
+        return line.decode("utf-8", errors="replace")
+
+    def compact(self):
+        """Empty the file if everything in it was read; called with the lock held"""
+        # scrcpy menambahkan di akhir file, jadi ia lanjut saja dari awal yang baru. Output yang ditulis di antara
+        # cek ukuran dan truncate hilang, paling banyak satu baris log.
+        if not self.partial and self.offset == os.fstat(self.file.fileno()).st_size:
+            os.truncate(self.path, 0)
+            self.file.seek(0)
+            self.offset = 0
+
+    def close(self):
+        """Stop reading, safe from another thread; returns where a later reader continues"""
+        with self.lock:
+            self.closed = True
+            self.compact()
+            return self.offset
+
+class AdoptedProcess:
+    """A scrcpy started by an earlier connector run; not our child, so it is watched by pid"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, 0)
+            except ProcessLookupError:
+                # Di-reap oleh init, yang menyimpan exit status untuk dirinya sendiri
+                self.returncode = 0
+            except PermissionError:
+                pass
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.time() >= deadline:
+                raise subprocess.TimeoutExpired("scrcpy", timeout)
+            time.sleep(0.1)
+        return self.returncode
+
+    def send_signal(self, signum):
+        try:
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+class ScrcpyManager:
+    def __init__(self, config, ui=None, registry=None, tailscale=None, adb=None, server_port=None):
+        self.ui = ui or Dashboard()
+        self.adb = adb or AdbScheduler(config.adb_concurrency)
+        # Server adb tempat perangkat ini ditempatkan; None adalah server default
+        self.server_port = server_port
+        self.registry = registry
+        self.tailscale = tailscale
+        self.tailscale_notice = None
+        self.config = config
+        self.device_key = config.key
+        self.journal = self.open_journal(config)
+        self.server_info = None
+        self.staged_servers = {}
+        self.staging_lock = threading.Lock()
+        self.stopped = False
+        self.reload_pending = False
+        self.last_stall = None
+        self.last_output = None
+        self.path_latency = {}
+        self.heartbeats = {}
+        self.encoder = None
+        self.failed_encoders = set()
+        self.throttle_level = 0
+        self.throttle_pending = False
+        self.rebalance_pending = False
+        self.handing_off = False
+        self.adopted = None
+        self.active_session = None
+        self.active_output = None
+        self.active_target = None
+        self.active_type = None
+        self.active_process = None
+        self.active_watchdog = None
+        self.pending_switch = None
+        # Hanya mode worker: dibagi dengan supervisor, pid scrcpy yang berjalan (0 jika tidak ada)
+        self.session_pid = None
+
+    def reload_config(self, config, restart):
+        """Swap in edited settings; restart the session only if it is affected"""
+        if config.key != self.device_key:
+            self.ui.remove(self.device_key)
+            self.device_key = config.key
+        if config.changed_fields(self.config) & {"video_codec", "video_encoder", "encoder_selection"}:
+            self.encoder = None
+        self.config = config
+        self.journal = self.open_journal(config)
+        if restart:
+            self.reload_pending = True
+            if self.active_process:
+                self.stop_process(self.active_process)
+
+    def adopt(self, state):
+        """Take over a session a previous connector run left running; False if it cannot be"""
+        process = AdoptedProcess(state["pid"])
+        if process.poll() is not None or not is_scrcpy_process(state["pid"]):
+            return False
+
+        self.encoder = tuple(state["encoder"]) if state.get("encoder") else None
+        self.throttle_level = min(state.get("throttle_level", 0), len(THROTTLE_STEPS) - 1)
+        # Pengaturan atau server adb berubah di antaranya: sesi tetap perlu restart
+        if state["args"] != self.build_scrcpy_args(state["target"]) or state.get("server_port") != self.server_port:
+            self.ui.log(f"{Colors.WARNING}♻️  {self.device_key}: pengaturan berubah sejak handoff - me-restart sesinya{Colors.RESET}")
+            self.stop_process(process)
+            return False
+
+        self.adopted = state
+        return True
+
+    def hand_off(self):
+        """Stop managing the running session without ending it; returns what the next run needs"""
+        process, output, session = self.active_process, self.active_output, self.active_session
+        if not (isinstance(output, SessionOutput) and session and process.poll() is None):
+            # Tidak ada yang berjalan, atau sesi yang menulis ke pipe kita dan tidak bisa hidup lebih lama dari kita
+            self.stop()
+            return None
+        self.handing_off = True
+        self.stopped = True
+        offset = output.close()
+        self.ui.remove(self.device_key)
+        return dict(session, pid=process.pid, output=output.path, offset=offset)
+
+    def save_session_state(self, process, output):
+        """Note where the session can be found, in case this run dies without handing it off"""
+        state = dict(self.active_session, pipeline_id=self.config.pipeline_id, pid=process.pid, output=output.path)
+        write_json_file(session_file_path(self.config.pipeline_id, "state"), state)
+
+    def move_to_server(self, server_port):
+        """Continue on another adb server; the session restarts and reconnects through it"""
+        previous = self.server_port
+        self.server_port = server_port
+        self.journal.record("rebalance", server=server_port, previous=previous)
+        self.ui.log(f"{Colors.WARNING}🔀 {self.device_key}: pindah dari server adb :{previous} ke :{server_port}{Colors.RESET}")
+        self.rebalance_pending = True
+        if self.active_process:
+            self.stop_process(self.active_process)
+
+    def open_journal(self, config):
+        return SessionJournal(config.pipeline_id, config.journal_max_size * 1024, config.journal_backups)
+
+    def stop(self):
+        """Stop this device pipeline for good"""
+        self.stopped = True
+        if self.active_process:
+            self.stop_process(self.active_process)
+        self.ui.remove(self.device_key)
+
+    def run_command(self, cmd, silent=False, timeout=None):
         """Run command and return output"""
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            result = self.adb.run(cmd, timeout=timeout, server_port=self.server_port)
             if not silent and result.stdout.strip():
-                print(f"{Colors.DIM}↳ {result.stdout.strip()}{Colors.RESET}")
+                self.ui.log(f"{Colors.DIM}↳ {result.stdout.strip()}{Colors.RESET}")
             return result.stdout
         except Exception as e:
             if not silent:
-                print(f"{Colors.ERROR}↳ Error: {e}{Colors.RESET}")
+                self.ui.log(f"{Colors.ERROR}↳ Error: {e}{Colors.RESET}")
             return ""
 
     def print_step(self, step, message):
         """Print clean step message"""
-        print(f"{Colors.PRIMARY}[{step}] {message}{Colors.RESET}")
+        self.ui.log(f"{Colors.PRIMARY}[{step}] {message}{Colors.RESET}")
 
     def print_big_message(self, message, color, icon="✨"):
         """Print big epic message"""
-        print(f"\n{color}{Colors.BOLD}{icon} {'═' * 50}{icon}{Colors.RESET}")
-        print(f"{color}{Colors.BOLD}   {message}{Colors.RESET}")
-        print(f"{color}{Colors.BOLD}{icon} {'═' * 50}{icon}{Colors.RESET}\n")
+        self.ui.log(f"\n{color}{Colors.BOLD}{icon} {'═' * 50}{icon}{Colors.RESET}")
+        self.ui.log(f"{color}{Colors.BOLD}   {message}{Colors.RESET}")
+        self.ui.log(f"{color}{Colors.BOLD}{icon} {'═' * 50}{icon}{Colors.RESET}\n")
 
     def print_device_info(self, devices_output):
         """Print clean device information"""
         lines = devices_output.strip().split('\n')
         
-        print(f"{Colors.DIM}╔══════════════════════════════════════════╗{Colors.RESET}")
-        print(f"{Colors.DIM}║           📱 PERANGKAT TERSEDIA         ║{Colors.RESET}")
-        print(f"{Colors.DIM}╚══════════════════════════════════════════╗{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}╔══════════════════════════════════════════╗{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}║           📱 PERANGKAT TERSEDIA         ║{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}╚══════════════════════════════════════════╗{Colors.RESET}")
         
         for line in lines[1:]:
             if line.strip():
@@ -99,23 +1771,23 @@ class ScrcpyManager:
                     else:
                         device_display = f"{Colors.DEVICE}{device_id}{Colors.RESET}"
                     
-                    print(f"{Colors.DIM}║ {status_icon} {device_display} {status_color}{status}{Colors.RESET}{Colors.DIM} ║{Colors.RESET}")
+                    self.ui.log(f"{Colors.DIM}║ {status_icon} {device_display} {status_color}{status}{Colors.RESET}{Colors.DIM} ║{Colors.RESET}")
         
-        print(f"{Colors.DIM}╚══════════════════════════════════════════╝{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}╚══════════════════════════════════════════╝{Colors.RESET}")
 
     def find_usb_device(self):
         """Find USB device by ID or name"""
         devices_output = self.run_command("adb devices -l", silent=True)
         
         # Cari berdasarkan device_id
-        if self.config["device_id"] in devices_output and "device" in devices_output:
-            return self.config["device_id"]
+        if self.config.device_id in devices_output and "device" in devices_output:
+            return self.config.device_id
         
         # Cari berdasarkan device_name
-        if self.config["device_name"] in devices_output:
+        if self.config.device_name and self.config.device_name in devices_output:
             lines = devices_output.strip().split('\n')
             for line in lines:
-                if self.config["device_name"] in line and "device" in line:
+                if self.config.device_name in line and "device" in line:
                     parts = line.split()
                     if parts:
                         return parts[0]
@@ -124,74 +1796,197 @@ class ScrcpyManager:
 
     def setup_usb_connection(self):
         """Setup USB connection and enable TCP/IP mode"""
-        print(f"{Colors.WARNING}  ↳ Mencoba koneksi USB...{Colors.RESET}")
+        self.ui.log(f"{Colors.WARNING}  ↳ Mencoba koneksi USB...{Colors.RESET}")
         
         usb_device = self.find_usb_device()
         
         if usb_device:
-            print(f"{Colors.SUCCESS}    ✅ Perangkat USB terdeteksi: {usb_device}{Colors.RESET}")
-            print(f"{Colors.WARNING}    ↳ Mengaktifkan mode TCP/IP...{Colors.RESET}")
+            self.ui.log(f"{Colors.SUCCESS}    ✅ Perangkat USB terdeteksi: {usb_device}{Colors.RESET}")
+            self.ui.log(f"{Colors.WARNING}    ↳ Mengaktifkan mode TCP/IP...{Colors.RESET}")
             
-            self.run_command(f"adb -s {usb_device} tcpip {self.config['port']}", silent=True)
+            self.run_command(f"adb -s {usb_device} tcpip {self.config.port}", silent=True)
             time.sleep(3)
             
             return True
         else:
-            print(f"{Colors.ERROR}    ❌ Perangkat USB tidak terdeteksi{Colors.RESET}")
+            self.ui.log(f"{Colors.ERROR}    ❌ Perangkat USB tidak terdeteksi{Colors.RESET}")
             return False
 
+    def enable_wireless_over_usb(self, usb_device):
+        """Switch adbd to TCP mode over USB, unless it is listening already"""
+        tcp_port = self.run_command(
+            f"adb -s {usb_device} shell getprop service.adb.tcp.port", silent=True, timeout=5
+        ).strip()
+        if tcp_port == str(self.config.port):
+            return
+
+        # tcpip me-restart adbd, jadi harus dilakukan sebelum scrcpy jalan lewat kabel.
+        # Tunggu transport USB kembali, bukan sleep dengan waktu tetap.
+        self.ui.log(f"{Colors.WARNING}    ↳ Mengaktifkan mode TCP/IP...{Colors.RESET}")
+        self.run_command(f"adb -s {usb_device} tcpip {self.config.port}", silent=True, timeout=10)
+        self.run_command(f"adb -s {usb_device} wait-for-device", silent=True, timeout=10)
+
+    def bootstrap_wireless(self):
+        """Bring wireless transports up behind a USB session, so a cable pull hands over at once"""
+        for connection_name, connection_target, connection_type in self.get_connection_methods():
+            if connection_type == "usb" or not connection_target:
+                continue
+            if self.bring_up_path(connection_target, connection_type):
+                self.ui.log(f"{Colors.SUCCESS}    ✅ {connection_name} siap sebagai cadangan ({connection_target}){Colors.RESET}")
+
     def connect_with_timeout(self, connection_name, connection_ip, timeout=None):
         """Try to connect with timeout and REAL verification"""
         if timeout is None:
-            timeout = int(self.config.get("timeout_delay", 3))
+            timeout = self.config.timeout_delay
             
-        print(f"  ↳ Mencoba {connection_name}...")
-        
-        # Disconnect dulu buat bersihin state
-        self.run_command(f"adb disconnect {connection_ip}", silent=True)
-        time.sleep(0.5)
+        self.ui.log(f"  ↳ Mencoba {connection_name}...")
+
+        # Sesi-sesi satu ponsel berbagi transport-nya: satu connect dalam satu waktu, dan
+        # disconnect di sini tidak boleh memutus jalur yang baru saja dinyalakan sesi saudaranya
+        with CONNECT_LOCKS[self.config.device_id]:
+            if self.get_device_states().get(connection_ip) == "device" and self.ping_device(connection_ip, timeout=2) is not None:
+                self.ui.log(f"{Colors.SUCCESS}    ✅ Sudah terhubung ({connection_ip}){Colors.RESET}")
+                return True
+
+            # Disconnect dulu buat bersihin state
+            self.run_command(f"adb disconnect {connection_ip}", silent=True)
+            time.sleep(0.5)
         
-        def connect():
-            self.run_command(f"adb connect {connection_ip}", silent=True)
+            def connect():
+                # Dibatasi, supaya connect yang macet tidak menahan slot scheduler adb
+                self.run_command(f"adb connect {connection_ip}", silent=True, timeout=timeout)
         
-        # Jalankan connect di thread terpisah
-        thread = threading.Thread(target=connect)
-        thread.start()
-        thread.join(timeout)
+            # Jalankan connect di thread terpisah. Timeout dimulai saat scheduler menjalankannya:
+            # waktu antre di belakang perangkat lain tidak boleh dihitung sebagai connect gagal
+            thread = threading.Thread(target=connect)
+            thread.start()
+            thread.join()
         
-        # Kasih waktu untuk device list update
-        time.sleep(1)
+            # Kasih waktu untuk device list update
+            time.sleep(1)
         
-        # VERIFIKASI REAL - cek apakah benar-benar device (bukan offline)
-        new_devices = self.run_command("adb devices", silent=True)
+            # VERIFIKASI REAL - cek apakah benar-benar device (bukan offline)
+            new_devices = self.run_command("adb devices", silent=True)
         
-        # Cek apakah IP ada dan statusnya DEVICE (bukan offline)
-        if connection_ip in new_devices and f"{connection_ip}\tdevice" in new_devices:
-            ip, port = connection_ip.split(':')
-            print(f"{Colors.SUCCESS}    ✅ Terhubung ke {Colors.DEVICE}{ip}{Colors.SUCCESS}:{Colors.PORT}{port}{Colors.SUCCESS}{Colors.RESET}")
+            # Cek apakah IP ada dan statusnya DEVICE (bukan offline)
+            if connection_ip in new_devices and f"{connection_ip}\tdevice" in new_devices:
+                ip, port = connection_ip.split(':')
+                self.ui.log(f"{Colors.SUCCESS}    ✅ Terhubung ke {Colors.DEVICE}{ip}{Colors.SUCCESS}:{Colors.PORT}{port}{Colors.SUCCESS}{Colors.RESET}")
+                return True
+            else:
+                # Cleanup jika gagal
+                self.run_command(f"adb disconnect {connection_ip}", silent=True)
+                self.ui.log(f"{Colors.WARNING}    ⏰ Timeout {timeout}s - Lanjut ke mode berikutnya...{Colors.RESET}")
+                return False
+
+    def sibling_targets(self):
+        """Transports the other sessions of this phone are mirroring over"""
+        return {target for pipeline_id, target in list(ACTIVE_TARGETS[self.config.device_id].items()) if pipeline_id != self.config.pipeline_id}
+
+    def ping_device(self, device_ip, timeout=None):
+        """Cheap device round-trip, returns latency in seconds or None"""
+        start = time.time()
+        output = self.run_command(f"adb -s {device_ip} shell echo ok", silent=True, timeout=timeout)
+        if output.strip() != "ok":
+            return None
+
+        # Latensi per jalur yang dihaluskan, dipakai untuk membandingkan jalur
+        latency = time.time() - start
+        previous = self.path_latency.get(device_ip)
+        self.path_latency[device_ip] = latency if previous is None else previous * 0.7 + latency * 0.3
+        if device_ip == self.active_target:
+            self.ui.update(self.device_key, latency=self.path_latency[device_ip] * 1000)
+        return latency
+
+    def bring_up_path(self, connection_target, connection_type):
+        """Make sure a transport for the path is up, without disturbing other transports"""
+        if self.get_device_states().get(connection_target) == "device":
             return True
-        else:
-            # Cleanup jika gagal
-            self.run_command(f"adb disconnect {connection_ip}", silent=True)
-            print(f"{Colors.WARNING}    ⏰ Timeout {timeout}s - Lanjut ke mode berikutnya...{Colors.RESET}")
+        if connection_type == "usb":
+            return False
+
+        # Probe TCP murah dulu, supaya alamat yang tidak terjangkau tidak perlu adb connect
+        ip, port = connection_target.split(':')
+        try:
+            socket.create_connection((ip, int(port)), timeout=1).close()
+        except OSError:
             return False
 
+        timeout = self.config.timeout_delay
+        self.run_command(f"adb connect {connection_target}", silent=True, timeout=timeout)
+        return self.get_device_states().get(connection_target) == "device"
+
+    def request_switch(self, connection):
+        """Stop the running session so the reconnect loop picks up the given path"""
+        connection_name, connection_target, connection_type = connection
+        self.pending_switch = connection
+        self.ui.update(self.device_key, state="switching", note=connection_type)
+        self.ui.log(f"\n{Colors.SUCCESS}⚡ Upgrade ke {connection_name} ({connection_target})...{Colors.RESET}")
+        if self.active_process:
+            self.stop_process(self.active_process)
+
+    def stop_process(self, process):
+        """Stop a scrcpy process, forcing it if it does not exit quickly"""
+        if process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def resolve_tailscale(self):
+        """Ask tailscaled about the peer: (ip, relayed), or None when it is offline"""
+        ip = self.config.tailscale_ip
+        peer = self.tailscale.find_peer(self.config.tailscale_name, ip) if self.tailscale else None
+        if peer is None:
+            # Tidak ada jawaban tailscaled atau peer tidak dikenal - pakai alamat dari config
+            return (ip, False) if ip else None
+
+        if not peer['online']:
+            notice = "offline"
+            if self.tailscale_notice != notice:
+                self.ui.log(f"{Colors.WARNING}  ↳ Tailscale peer {peer['hostname']} sedang offline - dilewati{Colors.RESET}")
+        elif peer['ip'] != ip:
+            notice = f"ip:{peer['ip']}"
+            if self.tailscale_notice != notice:
+                self.ui.log(f"{Colors.PRIMARY}  ↳ IP Tailscale {peer['hostname']} sekarang {peer['ip']}{Colors.RESET}")
+                if self.registry:
+                    self.registry.record_address(self.config.device_id, peer['ip'], "tailscale")
+        elif not peer['direct']:
+            notice = f"relay:{peer['relay']}"
+            if self.tailscale_notice != notice:
+                self.ui.log(f"{Colors.WARNING}  ↳ Jalur Tailscale lewat relay DERP ({peer['relay']}) - dicoba paling akhir{Colors.RESET}")
+        else:
+            notice = None
+        self.tailscale_notice = notice
+
+        if not peer['online']:
+            return None
+        return peer['ip'], not peer['direct']
+
     def get_connection_methods(self):
         """Get connection methods based on priority configuration"""
-        priority = self.config.get("priority", ["tailscale", "local-ip", "usb"])
+        priority = self.config.priority
         methods = []
+        relayed = []
         
         for method in priority:
             if method == "tailscale":
-                methods.append((
+                resolved = self.resolve_tailscale()
+                if resolved is None:
+                    continue
+                tailscale_ip, is_relayed = resolved
+                # Jalur lewat relay DERP lebih lambat dari jalur langsung mana pun, jadi ditaruh paling akhir
+                (relayed if is_relayed else methods).append((
                     "🌐 TAILSCALE", 
-                    f"{self.config['tailscale_ip']}:{self.config['port']}",
+                    f"{tailscale_ip}:{self.config.port}",
                     "tailscale"
                 ))
             elif method == "local-ip":
                 methods.append((
                     "📡 LOCAL WIFI", 
-                    f"{self.config['local_ip']}:{self.config['port']}",
+                    f"{self.config.local_ip}:{self.config.port}",
                     "wifi"
                 ))
             elif method == "usb":
@@ -201,7 +1996,113 @@ class ScrcpyManager:
                     "usb"
                 ))
         
-        return methods
+        return methods + relayed
+
+    def get_server_info(self):
+        """Get bundled scrcpy-server path, version and hash (computed once)"""
+        if self.server_info is not None:
+            return self.server_info
+
+        server_path = os.path.abspath(os.environ.get("SCRCPY_SERVER_PATH", "scrcpy-server"))
+        server_hash = None
+        try:
+            with open(server_path, 'rb') as f:
+                server_hash = hashlib.md5(f.read()).hexdigest()
+        except OSError:
+            pass
+
+        # "scrcpy 3.3.3 <https://github.com/Genymobile/scrcpy>"
+        version = None
+        match = re.search(r"scrcpy (\d+(?:\.\d+)+)", self.run_command("scrcpy --version", silent=True))
+        if not match:
+            match = re.search(r"v(\d+(?:\.\d+)+)", os.path.basename(os.getcwd()))
+        if match:
+            version = match.group(1)
+
+        self.server_info = {
+            'path': server_path,
+            'version': version,
+            'hash': server_hash,
+            'device_path': f"{DEVICE_STAGING_DIR}/scrcpy-server-{version or 'unknown'}.jar"
+        }
+        return self.server_info
+
+    def is_server_staged(self, device_ip):
+        """Check if the device already holds the bundled server (by hash)"""
+        info = self.get_server_info()
+        if not info['hash']:
+            return False
+
+        # Sudah terverifikasi sebelumnya - tidak perlu round-trip adb
+        if self.staged_servers.get(device_ip) == info['hash']:
+            return True
+
+        output = self.run_command(
+            f"adb -s {device_ip} shell \"md5sum {info['device_path']} 2>/dev/null\"", silent=True
+        )
+        parts = output.split()
+        if parts and parts[0].lower() == info['hash']:
+            self.staged_servers[device_ip] = info['hash']
+            return True
+        return False
+
+    def stage_server(self, device_ip):
+        """Push the server to its staging path, only when missing or stale"""
+        with self.staging_lock:
+            if self.is_server_staged(device_ip):
+                return False
+
+            info = self.get_server_info()
+            if not info['hash']:
+                return False
+
+            self.run_command(f'adb -s {device_ip} push "{info["path"]}" {info["device_path"]}', silent=True)
+            self.staged_servers.pop(device_ip, None)
+            if self.is_server_staged(device_ip):
+                self.ui.log(f"{Colors.DIM}↳ scrcpy-server {info['version']} sudah di-staging di {device_ip}{Colors.RESET}")
+                return True
+            return False
+
+    def get_device_states(self):
+        """Get adb's current view of every transport as {serial: state}"""
+        devices_output = self.run_command("adb devices", silent=True)
+        states = {}
+        for line in devices_output.strip().split('\n')[1:]:
+            parts = line.split('\t')
+            if len(parts) >= 2:
+                states[parts[0].strip()] = parts[1].strip()
+        return states
+
+    def is_warm(self, connection_target):
+        """True if a keepalive heartbeat got through recently enough to skip another ping"""
+        last_heartbeat = self.heartbeats.get(connection_target)
+        interval = self.config.keepalive_interval
+        return bool(interval and last_heartbeat and time.time() - last_heartbeat < interval * 2)
+
+    def select_failover_connection(self, failed_target=None):
+        """Re-run path selection after a session dropped, preferring paths that are up"""
+        states = self.get_device_states()
+        methods = [method for method in self.get_connection_methods() if method[1]]
+
+        # Jalur yang sudah "device" di adb didahulukan (urut prioritas, sort-nya stabil),
+        # lalu yang perlu connect ulang, dengan jalur yang barusan gagal paling akhir.
+        def rank(method):
+            is_down = states.get(method[1]) != "device"
+            return (is_down, is_down and method[1] == failed_target)
+
+        methods.sort(key=rank)
+
+        for connection_name, connection_target, connection_type in methods:
+            if states.get(connection_target) == "device":
+                # Jalur cadangan dengan heartbeat baru-baru ini tidak perlu round-trip lagi
+                warm = connection_target != failed_target and self.is_warm(connection_target)
+                if connection_type == "usb" or warm or self.ping_device(connection_target, timeout=2) is not None:
+                    return connection_name, connection_target, connection_type
+            elif connection_type != "usb":
+                if self.connect_with_timeout(connection_name, connection_target):
+                    return connection_name, connection_target, connection_type
+
+        return None
 
     def parse_scrcpy_output(self, line):
         """Parse and style scrcpy output lines"""
@@ -225,50 +2126,358 @@ class ScrcpyManager:
         
         return None
 
-    def run_scrcpy_with_filtered_output(self, device_ip):
-        """Run scrcpy with filtered and styled output"""
+    def throttled_profile(self):
+        """max_size and max_fps after the current thermal throttle step"""
+        share, fps_cap = THROTTLE_STEPS[self.throttle_level]
+        max_size = self.config.max_size
+        if share < 1:
+            # Kelipatan 8 aman untuk semua encoder
+            max_size = int((max_size or THROTTLE_BASE_SIZE) * share) // 8 * 8
+        max_fps = self.config.max_fps
+        if fps_cap:
+            max_fps = min(max_fps, fps_cap) if max_fps else fps_cap
+        return max_size, max_fps
+
+    def read_device_health(self, device_ip):
+        """Thermal and battery state in one adb round-trip"""
+        output = self.run_command(
+            f'adb -s {device_ip} shell "dumpsys thermalservice; dumpsys battery"', silent=True, timeout=10
+        )
+        return parse_device_health(output)
+
+    def prepare_screen(self, device_ip):
+        """Wake the screen and dismiss the keyguard in one adb round-trip, so the stream starts usable"""
+        # Display virtual tidak perlu dibangunkan sendiri; sesi layar ponsel yang melakukannya
+        if not self.config.wake_screen or (self.config.display and self.config.main_display):
+            return
+
+        commands = ["input keyevent KEYCODE_WAKEUP", "wm dismiss-keyguard", "sleep 0.5"]
+        if self.config.unlock_pin:
+            # Hanya diketik ke keyguard yang tampil, tidak pernah ke aplikasi apa pun yang ada di depan
+            commands.append(
+                f"dumpsys window policy | grep -q '^ *showing=true' && "
+                f"input text {self.config.unlock_pin} && input keyevent KEYCODE_ENTER && sleep 0.5"
+            )
+        commands += ["dumpsys power | grep mWakefulness=", "dumpsys window policy | grep '^ *showing='"]
+        output = self.run_command(f'adb -s {device_ip} shell "{"; ".join(commands)}"', silent=True, timeout=10)
+
+        state = parse_screen_state(output)
+        self.journal.record("wake", **state)
+        if state.get("locked"):
+            self.ui.log(f"{Colors.WARNING}🔒 Perangkat masih terkunci - masukkan PIN/pola/password atau gunakan face unlock{Colors.RESET}")
+        elif state.get("awake") is False:
+            self.ui.log(f"{Colors.WARNING}💤 Layar perangkat tidak menyala{Colors.RESET}")
+
+    def set_throttle(self, level, health):
+        """Move to another throttle step; the session restarts with the new profile"""
+        stepping_down = level > self.throttle_level
+        self.throttle_level = level
+        self.journal.record("throttle", level=level, step="down" if stepping_down else "up", **health)
+
+        max_size, max_fps = self.throttled_profile()
+        profile = f"{max_size or 'full'}px @ {max_fps or 'max'} fps"
+        readings = []
+        if "thermal_status" in health:
+            readings.append(f"status termal {health['thermal_status']}")
+        if "battery_temperature" in health:
+            readings.append(f"baterai {health['battery_temperature']:.1f}°C")
+        if "battery_level" in health:
+            readings.append(f"{health['battery_level']}%")
+        readings = f" ({', '.join(readings)})" if readings else ""
+        if not health:
+            self.ui.log(f"\n{Colors.PRIMARY}🌡️  Throttling termal dimatikan - kembali ke {profile}{Colors.RESET}")
+        elif stepping_down:
+            self.ui.log(f"\n{Colors.WARNING}🌡️  Perangkat panas{readings} - turun ke {profile}{Colors.RESET}")
+        else:
+            self.ui.log(f"\n{Colors.SUCCESS}❄️  Perangkat sudah dingin{readings} - naik ke {profile}{Colors.RESET}")
+
+        self.throttle_pending = True
+        if self.active_process:
+            self.stop_process(self.active_process)
+
+    def build_scrcpy_args(self, device_ip):
+        """scrcpy command line for this device's encoding profile"""
+        max_size, max_fps = self.throttled_profile()
+        args = ["scrcpy", "-s", device_ip, "--no-audio", "--max-size", str(max_size), "--print-fps"]
+        if max_fps:
+            args += ["--max-fps", str(max_fps)]
+        if self.config.video_bit_rate:
+            args += ["--video-bit-rate", self.config.video_bit_rate]
+        codec, encoder = self.config.video_codec, self.config.video_encoder
+        if not (codec or encoder) and self.encoder:
+            codec, encoder = self.encoder
+        if codec:
+            args += ["--video-codec", codec]
+        if encoder:
+            args += ["--video-encoder", encoder]
+        if self.config.display:
+            # Display sendiri, supaya aplikasi berjalan di samping apa pun yang ada di layar ponsel
+            size = self.config.display.get("display_size")
+            args.append(f"--new-display={size}" if size else "--new-display")
+            if self.config.display.get("app"):
+                args.append(f"--start-app={self.config.display['app']}")
+            args += ["--window-title", self.device_key]
+        elif self.config.stay_awake or self.config.screen_off:
+            # Hanya sesi layar ponsel itu sendiri: tiap scrcpy mengembalikan pengaturan ini saat keluar,
+            # dan scrcpy kedua akan mengembalikan nilai yang dipasang scrcpy pertama
+            if self.config.stay_awake:
+                # --stay-awake untuk ponsel yang dicolok, screen timeout untuk ponsel dengan baterai
+                args += ["--stay-awake", f"--screen-off-timeout={STAY_AWAKE_TIMEOUT}"]
+            if self.config.screen_off:
+                args.append("--turn-screen-off")
+        return args
+
+    def select_encoder(self, device_ip):
+        """Pick this device's video encoder: from config, the registry cache, or by probing"""
+        if self.encoder or self.config.video_encoder or self.config.video_codec or self.config.encoder_selection == "off":
+            return
+
+        # Mode benchmark hanya menerima pilihan hasil benchmark
+        cached = self.registry.get_encoder(self.config.device_id) if self.registry else None
+        if cached and self.config.encoder_selection == "benchmark" and cached['method'] != "benchmark":
+            cached = None
+        if cached and (cached['codec'], cached['encoder']) not in self.failed_encoders:
+            self.encoder = (cached['codec'], cached['encoder'])
+            return
+
+        self.ui.log(f"{Colors.PRIMARY}🔎 Memeriksa encoder video...{Colors.RESET}")
+        output = self.run_command(f"scrcpy -s {device_ip} --list-encoders 2>&1", silent=True, timeout=30)
+        candidates = [
+            candidate for candidate in rank_encoders(parse_encoders(output))
+            if (candidate["codec"], candidate["encoder"]) not in self.failed_encoders
+        ]
+        if not candidates:
+            self.ui.log(f"{Colors.WARNING}   ↳ Tidak ada daftar encoder dari perangkat - memakai default scrcpy{Colors.RESET}")
+            return
+
+        startup = None
+        if self.config.encoder_selection == "benchmark":
+            choice, startup = self.benchmark_encoders(device_ip, candidates)
+            if choice is None:
+                self.ui.log(f"{Colors.WARNING}   ↳ Tidak ada encoder yang lolos benchmark - memakai default scrcpy{Colors.RESET}")
+                return
+        else:
+            choice = candidates[0]
+
+        self.encoder = (choice["codec"], choice["encoder"])
+        if self.registry:
+            startup_ms = round(startup * 1000) if startup is not None else None
+            self.registry.record_encoder(self.config.device_id, choice["codec"], choice["encoder"], self.config.encoder_selection, startup_ms)
+        self.ui.log(f"{Colors.SUCCESS}🎞️  Memakai encoder {choice['codec']} {choice['encoder']}{Colors.RESET}")
+
+    def benchmark_encoders(self, device_ip, candidates):
+        """Short recorded sessions per encoder; the first to deliver output that also exits cleanly wins"""
+        best, best_startup = None, None
+        for candidate in candidates[:ENCODER_BENCHMARK_CANDIDATES]:
+            startup = self.measure_encoder(device_ip, candidate)
+            if startup is None:
+                self.ui.log(f"{Colors.DIM}   ↳ {candidate['codec']} {candidate['encoder']}: gagal{Colors.RESET}")
+                continue
+            self.ui.log(f"{Colors.DIM}   ↳ {candidate['codec']} {candidate['encoder']}: output pertama setelah {startup * 1000:.0f} ms{Colors.RESET}")
+            if best_startup is None or startup < best_startup:
+                best, best_startup = candidate, startup
+        return best, best_startup
+
+    def measure_encoder(self, device_ip, candidate):
+        """Seconds until an encoder produced its first recorded output, or None if it failed"""
+        path = os.path.join(tempfile.gettempdir(), f"scrcpy-encoder-probe-{os.getpid()}-{threading.get_ident()}.mkv")
+        args = [
+            "scrcpy", "-s", device_ip, "--no-audio", "--no-playback", "--max-size", str(self.config.max_size),
+            "--video-codec", candidate["codec"], "--video-encoder", candidate["encoder"],
+            "--record", path, "--time-limit", str(ENCODER_BENCHMARK_SECONDS),
+        ]
+        first_output = None
+        started = time.time()
         try:
             process = subprocess.Popen(
-                f"scrcpy -s {device_ip} --no-audio --max-size 1024",
-                shell=True,
+                args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=adb_server_env(self.server_port)
+            )
+        except OSError:
+            return None
+
+        while process.poll() is None:
+            if first_output is None and os.path.exists(path) and os.path.getsize(path) > 0:
+                first_output = time.time() - started
+            if time.time() - started > ENCODER_BENCHMARK_SECONDS + 10:
+                self.stop_process(process)
+                break
+            time.sleep(0.05)
+
+        if first_output is None and os.path.exists(path) and os.path.getsize(path) > 0:
+            first_output = time.time() - started
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return first_output if process.returncode == 0 else None
+
+    def check_encoder_failure(self):
+        """Drop an encoder the device could not run, so the next session picks another"""
+        if not self.encoder:
+            return
+        for line in self.last_output or []:
+            lowered = line.lower()
+            if "error" in lowered and ("encod" in lowered or "mediacodec" in lowered):
+                self.ui.log(f"{Colors.WARNING}⚠️  Encoder {self.encoder[1]} gagal - memilih yang lain{Colors.RESET}")
+                self.failed_encoders.add(self.encoder)
+                self.encoder = None
+                if self.registry:
+                    self.registry.forget_encoder(self.config.device_id)
+                return
+
+    def start_scrcpy(self, args):
+        """Start scrcpy; returns the process and the stream its output is read from"""
+        limited = self.config.scrcpy_nice or self.config.scrcpy_memory_limit
+        if limited:
+            # Server adb yang terpaksa dijalankan scrcpy akan mewarisi batasannya
+            self.run_command("adb start-server", silent=True)
+
+        if not self.config.session_handoff:
+            options = scrcpy_process_options(self.config)
+            if self.session_pid is not None:
+                # Process group sendiri, supaya supervisor bisa mengakhirinya jika worker ini mati
+                options.update(own_process_group(options))
+            # Pakai list argumen (tanpa shell) supaya menghentikan proses = menghentikan scrcpy itu sendiri
+            process = subprocess.Popen(
+                args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
                 bufsize=1,
-                universal_newlines=True
+                universal_newlines=True,
+                env=adb_server_env(self.server_port),
+                **options
             )
-            
+            output = process.stdout
+            if self.session_pid is not None:
+                self.session_pid.value = process.pid
+        else:
+            # Output ke file dan session sendiri: baik keluarnya kita maupun Ctrl+C di
+            # terminal ini tidak mengakhiri sesi, jadi run connector berikutnya bisa mengambil alihnya
+            path = session_file_path(self.config.pipeline_id, "log")
+            os.makedirs(SESSIONS_DIR, exist_ok=True)
+            # Mode append, supaya scrcpy ikut saat SessionOutput mengosongkan file
+            with open(path, "ab") as output_file:
+                output_file.truncate(0)
+                process = subprocess.Popen(
+                    args,
+                    stdin=subprocess.DEVNULL,
+                    stdout=output_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                    env=adb_server_env(self.server_port),
+                    **scrcpy_process_options(self.config)
+                )
+            output = SessionOutput(path, process)
+            self.save_session_state(process, output)
+
+        if limited:
+            limit_scrcpy_process(process.pid, self.config)
+        return process, output
+
+    def run_scrcpy_with_filtered_output(self, device_ip, adopted=None):
+        """Run scrcpy with filtered and styled output"""
+        process = None
+        watchdog = None
+        # Baris mentah terakhir dengan memori tetap, ditampilkan hanya jika sesi mati
+        recent_output = collections.deque(maxlen=self.config.diagnostic_lines)
+        self.last_output = recent_output
+        try:
+            if adopted:
+                process = AdoptedProcess(adopted["pid"])
+                output = SessionOutput(adopted["output"], process, adopted["offset"])
+                self.active_session["args"] = adopted["args"]
+            else:
+                args = self.build_scrcpy_args(device_ip)
+                self.active_session["args"] = args
+                process, output = self.start_scrcpy(args)
+            watchdog = SessionWatchdog(self, device_ip, process).start()
+            self.active_process = process
+            self.active_output = output
+            self.active_watchdog = watchdog
+            # stop() mungkin sudah berjalan saat scrcpy masih start dan tidak menemukan apa pun untuk dihentikan
+            if self.stopped and not self.handing_off:
+                self.stop_process(process)
+
             # Baca output real-time
             while True:
-                line = process.stdout.readline()
+                line = output.readline()
                 if not line:
                     break
+
+                watchdog.feed(line)
+                recent_output.append(line.rstrip())
+                if line.startswith(("ERROR:", "WARN:")):
+                    level, _, message = line.partition(":")
+                    self.journal.record("scrcpy", level=level.lower(), message=message.strip())
                     
                 # Parse dan tampilkan hanya informasi yang diinginkan
                 styled_line = self.parse_scrcpy_output(line)
                 if styled_line:
-                    print(styled_line)
+                    self.ui.log(styled_line)
                     
                 # Check if process has terminated
                 if process.poll() is not None:
                     break
-                    
-            return process.wait()
+
+            # Diserahkan: sesi tetap berjalan untuk run connector berikutnya
+            if self.handing_off:
+                return None
+            return_code = process.wait()
+            self.last_stall = watchdog.stalled
+            return return_code
             
         except KeyboardInterrupt:
-            print(f"\n{Colors.WARNING}👋 Mirroring dihentikan{Colors.RESET}")
+            self.ui.log(f"\n{Colors.WARNING}👋 Mirroring dihentikan{Colors.RESET}")
             if process:
                 process.terminate()
             sys.exit(0)
         except Exception as e:
-            print(f"{Colors.ERROR}↳ Error: {e}{Colors.RESET}")
+            self.ui.log(f"{Colors.ERROR}↳ Error: {e}{Colors.RESET}")
+            # Jangan tinggalkan scrcpy yang output-nya tidak dibaca lagi
+            if process and not self.handing_off:
+                self.stop_process(process)
             return 1
+        finally:
+            if watchdog:
+                watchdog.stop()
+            if isinstance(self.active_output, SessionOutput):
+                self.active_output.file.close()
+                # Berakhir di sini, jadi tidak ada lagi yang bisa diambil alih run berikutnya
+                if not self.handing_off:
+                    with contextlib.suppress(OSError):
+                        os.remove(session_file_path(self.config.pipeline_id, "state"))
+            if self.session_pid is not None:
+                self.session_pid.value = 0
+            self.active_process = None
+            self.active_output = None
+            self.active_watchdog = None
+
+    def dump_last_output(self, return_code):
+        """Show and journal the raw scrcpy output that led up to an abnormal exit"""
+        lines = list(self.last_output or [])
+        if not lines:
+            return
+        self.journal.record("crash", code=return_code, lines=lines)
+        self.ui.log(f"{Colors.WARNING}🧾 Output scrcpy terakhir sebelum exit code {return_code}:{Colors.RESET}")
+        for line in lines:
+            self.ui.log(f"{Colors.DIM}   │ {line}{Colors.RESET}")
 
     def main(self):
-        print(f"\n{Colors.PRIMARY}✨ SCRCPY ULTIMATE CONNECTOR ✨{Colors.RESET}")
-        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        if self.adopted:
+            # Masih mirroring sejak run sebelumnya; pemilihan jalur baru dimulai setelah sesi itu selesai
+            self.run_scrcpy(self.adopted["target"], self.adopted["type"])
+        # Loop, bukan rekursi: perangkat yang offline berjam-jam tidak boleh menumpuk stack
+        while not self.stopped and not self.connect_once():
+            pass
+
+    def connect_once(self):
+        """One pass over the connection paths; True once a session ran"""
+        if self.stopped:
+            return True
 
         # [1] Scanning devices
+        self.ui.update(self.device_key, state="scanning")
         self.print_step("1", "Memindai perangkat...")
         devices_output = self.run_command("adb devices", silent=True)
         self.print_device_info(devices_output)
@@ -280,54 +2489,79 @@ class ScrcpyManager:
         usb_detected = usb_device is not None
         
         # Cek jika perlu setup USB (hanya jika ada USB device dan wireless offline)
-        wireless_offline = (
-            f"{self.config['tailscale_ip']}:{self.config['port']}" in devices_output and "offline" in devices_output or
-            f"{self.config['local_ip']}:{self.config['port']}" in devices_output and "offline" in devices_output
-        )
+        wireless_targets = [f"{ip}:{self.config.port}" for ip in (self.config.tailscale_ip, self.config.local_ip) if ip]
+        wireless_offline = any(target in devices_output for target in wireless_targets) and "offline" in devices_output
         
-        if wireless_offline and usb_detected:
-            print(f"{Colors.WARNING}  ↳ Perangkat wireless offline, mencoba USB...{Colors.RESET}")
+        # Ada USB: langsung mirror lewat kabel, siapkan wireless di background
+        usb_first = usb_detected and self.config.usb_bootstrap and "usb" in self.config.priority
+        if usb_first:
+            self.ui.log(f"{Colors.WARNING}  ↳ USB terdeteksi - mirror lewat USB, wireless disiapkan di background...{Colors.RESET}")
+            self.enable_wireless_over_usb(usb_device)
+            threading.Thread(target=self.bootstrap_wireless, daemon=True).start()
+        elif wireless_offline and usb_detected:
+            self.ui.log(f"{Colors.WARNING}  ↳ Perangkat wireless offline, mencoba USB...{Colors.RESET}")
             if self.setup_usb_connection():
                 time.sleep(2)
                 devices_output = self.run_command("adb devices", silent=True)
                 self.print_device_info(devices_output)
 
         # [3] CONNECTION SYSTEM BASED ON PRIORITY
-        self.print_step("3", f"Sistem koneksi prioritas ({', '.join(self.config['priority'])})...")
+        self.print_step("3", f"Priority connection system ({', '.join(self.config.priority)})...")
         
+        self.ui.update(self.device_key, state="connecting")
         connection_methods = self.get_connection_methods()
         connected = False
+
+        # Coba dulu jalur terakhir yang berhasil, sesuai catatan registry
+        known = self.registry.get_device(self.config.device_id) if self.registry else None
+        if known and known['last_target']:
+            connection_methods.sort(key=lambda method: method[1] != known['last_target'])
+        if usb_first:
+            connection_methods.sort(key=lambda method: method[2] != "usb")
         
         for connection_name, connection_target, connection_type in connection_methods:
             if connection_type == "usb":
                 # USB connection
-                print(f"  ↳ Mencoba {connection_name}...")
+                self.ui.log(f"  ↳ Mencoba {connection_name}...")
+                self.journal.record("attempt", path=connection_type, target=connection_target, ok=usb_detected, seconds=0)
                 if usb_detected:
                     self.print_big_message("TERHUBUNG KE USB", Colors.WARNING, "🔌")
-                    print(f"{Colors.WARNING}💡 PERINGATAN: Buka kunci perangkat Anda!{Colors.RESET}")
-                    print(f"{Colors.WARNING}   ↳ Masukkan PIN/pattern/password{Colors.RESET}")
-                    print(f"{Colors.WARNING}   ↳ Atau buka dengan face unlock{Colors.RESET}")
+                    if not self.config.wake_screen:
+                        self.ui.log(f"{Colors.WARNING}💡 PERINGATAN: Buka kunci perangkat Anda!{Colors.RESET}")
+                        self.ui.log(f"{Colors.WARNING}   ↳ Masukkan PIN/pattern/password{Colors.RESET}")
+                        self.ui.log(f"{Colors.WARNING}   ↳ Atau buka dengan face unlock{Colors.RESET}")
                     
                     connected = True
                     self.run_scrcpy(connection_target, connection_type)
-                    return
+                    return True
                 else:
-                    print(f"{Colors.ERROR}    ❌ Perangkat USB tidak terdeteksi{Colors.RESET}")
+                    self.ui.log(f"{Colors.ERROR}    ❌ Perangkat USB tidak terdeteksi{Colors.RESET}")
             else:
                 # Wireless connection (Tailscale/Local IP)
-                if self.connect_with_timeout(connection_name, connection_target):
+                # Transport yang sudah aktif dan merespons tidak perlu reconnect
+                attempt_started = time.time()
+                already_up = (
+                    f"{connection_target}\tdevice" in devices_output and
+                    self.ping_device(connection_target, timeout=2) is not None
+                )
+                connected = already_up or self.connect_with_timeout(connection_name, connection_target)
+                self.journal.record(
+                    "attempt", path=connection_type, target=connection_target, ok=connected,
+                    seconds=round(time.time() - attempt_started, 3)
+                )
+                if connected:
                     color = Colors.SUCCESS if connection_type == "tailscale" else Colors.PRIMARY
                     icon = "🌐" if connection_type == "tailscale" else "📡"
                     self.print_big_message(f"TERHUBUNG KE {connection_name.split()[1]}", color, icon)
-                    connected = True
                     self.run_scrcpy(connection_target, connection_type)
-                    return
+                    return True
 
-        if not connected:
-            print(f"{Colors.ERROR}  ❌ Tidak ada perangkat yang dapat dihubungi{Colors.RESET}")
-            print(f"{Colors.WARNING}  ↳ Mencoba ulang dalam 5 detik...{Colors.RESET}")
+        if not connected and not self.stopped:
+            self.journal.record("offline")
+            self.ui.log(f"{Colors.ERROR}  ❌ Tidak ada perangkat yang dapat dihubungi{Colors.RESET}")
+            self.ui.log(f"{Colors.WARNING}  ↳ Mencoba ulang dalam 5 detik...{Colors.RESET}")
             time.sleep(5)
-            self.main()
+        return False
 
     def run_scrcpy(self, device_ip, connection_type):
         if ':' in device_ip:
@@ -343,34 +2577,563 @@ class ScrcpyManager:
             "usb": f"{Colors.WARNING}USB Direct{Colors.RESET}"
         }
         
-        print(f"\n{Colors.SUCCESS}🎯 KONEKSI BERHASIL{Colors.RESET}")
-        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
-        print(f"{Colors.PRIMARY}📍 Perangkat: {display_text}{Colors.RESET}")
-        print(f"{Colors.PRIMARY}🔗 Tipe: {type_styles[connection_type]}{Colors.RESET}")
-        print(f"{Colors.DIM}⏹️  Tekan Ctrl+C untuk berhenti{Colors.RESET}")
-        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        self.ui.log(f"\n{Colors.SUCCESS}🎯 KONEKSI BERHASIL{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        self.ui.log(f"{Colors.PRIMARY}📍 Perangkat: {display_text}{Colors.RESET}")
+        self.ui.log(f"{Colors.PRIMARY}🔗 Tipe: {type_styles[connection_type]}{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}⏹️  Tekan Ctrl+C untuk berhenti{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
 
         connection_count = 0
-        auto_reconnect_delay = int(self.config.get("auto_reconnect_delay", 3))
+        upgrade_monitor = PathUpgradeMonitor(self).start()
+        keepalive = TransportKeepalive(self).start()
+        governor = ThermalGovernor.attach(self)
         
-        while True:
-            connection_count += 1
-            print(f"\n{Colors.PRIMARY}🔄 Memulai mirroring... ({connection_count}){Colors.RESET}")
-            
+        while not self.stopped:
+            # Putaran pertama sesi yang diambil alih melanjutkan sesi yang dimulai run sebelumnya
+            adopted, self.adopted = self.adopted, None
+            connection_count = adopted["sessions"] if adopted else connection_count + 1
+            self.active_target = device_ip
+            self.active_type = connection_type
+            with CONNECT_LOCKS[self.config.device_id]:
+                ACTIVE_TARGETS[self.config.device_id][self.config.pipeline_id] = device_ip
+            latency = self.path_latency.get(device_ip)
+            self.ui.update(
+                self.device_key, state="mirroring", path=connection_type, target=device_ip,
+                sessions=connection_count, fps=None, note=f"pendinginan {self.throttle_level}" if self.throttle_level else None,
+                latency=latency * 1000 if latency is not None else None
+            )
+            if adopted:
+                self.ui.log(f"\n{Colors.SUCCESS}🤝 Sesi yang berjalan diambil alih (pid {adopted['pid']}) - tidak perlu reconnect{Colors.RESET}")
+                connection_id = adopted.get("connection_id")
+                session_started = adopted["started"]
+                self.journal.record("adopt", path=connection_type, target=device_ip, pid=adopted["pid"])
+            else:
+                self.ui.log(f"\n{Colors.PRIMARY}🔄 Memulai mirroring... ({connection_count}){Colors.RESET}")
+                self.select_encoder(device_ip)
+                self.prepare_screen(device_ip)
+
+                connection_id = None
+                if self.registry:
+                    connection_id = self.registry.record_connection_start(self.config.device_id, connection_type, device_ip)
+                self.journal.record("session_start", path=connection_type, target=device_ip)
+                session_started = time.time()
+
+            # Semua yang dibutuhkan run connector berikutnya untuk mengambil alih sesi ini (lihat hand_off)
+            self.active_session = {
+                "target": device_ip, "type": connection_type, "started": session_started,
+                "sessions": connection_count, "connection_id": connection_id, "encoder": self.encoder,
+                "throttle_level": self.throttle_level, "server_port": self.server_port,
+            }
+
             # Jalankan scrcpy dengan output yang difilter
-            return_code = self.run_scrcpy_with_filtered_output(device_ip)
+            return_code = self.run_scrcpy_with_filtered_output(device_ip, adopted)
+            if self.handing_off:
+                break
+
+            if connection_id is not None:
+                self.registry.record_connection_end(connection_id, return_code)
+
+            if self.stopped:
+                reason = "stopped"
+            elif self.pending_switch:
+                reason = "upgrade"
+            elif self.reload_pending:
+                reason = "reload"
+            elif self.rebalance_pending:
+                reason = "rebalance"
+            elif self.throttle_pending:
+                reason = "throttle"
+            else:
+                reason = "lost"
+            self.journal.record(
+                "session_end", path=connection_type, target=device_ip, code=return_code, reason=reason,
+                stall=self.last_stall, seconds=round(time.time() - session_started, 3)
+            )
 
-            print(f"\n{Colors.WARNING}⚠️  Koneksi terputus{Colors.RESET}")
-            print(f"{Colors.DIM}↳ Menghubungkan ulang dalam {auto_reconnect_delay} detik...{Colors.RESET}")
+            if reason == "lost" and return_code != 0:
+                self.dump_last_output(return_code)
+                self.check_encoder_failure()
+
+            if self.stopped:
+                break
+
+            # Pindah terencana ke jalur lebih cepat - tidak perlu failover atau hitung mundur
+            if self.pending_switch:
+                connection_name, device_ip, connection_type = self.pending_switch
+                self.pending_switch = None
+                self.ui.log(f"{Colors.SUCCESS}🔀 Pindah ke {type_styles[connection_type]}{Colors.SUCCESS} ({device_ip}){Colors.RESET}")
+                continue
+
+            # Langkah termal - jalur sama, profil baru
+            if self.throttle_pending and not (self.reload_pending or self.rebalance_pending):
+                self.throttle_pending = False
+                continue
+            self.throttle_pending = False
+
+            # Perubahan config atau server adb lain - pilih ulang jalur dengan pengaturan baru
+            restarting = self.reload_pending or self.rebalance_pending
+            if self.reload_pending:
+                self.ui.log(f"\n{Colors.PRIMARY}♻️  Konfigurasi berubah, memulai ulang {self.device_key}...{Colors.RESET}")
+            elif self.rebalance_pending:
+                self.ui.log(f"\n{Colors.PRIMARY}♻️  Menghubungkan ulang {self.device_key} lewat server adb :{self.server_port}...{Colors.RESET}")
+            self.reload_pending = False
+            self.rebalance_pending = False
+            if not restarting:
+                self.ui.log(f"\n{Colors.WARNING}⚠️  Koneksi terputus{Colors.RESET}")
+
+            # Langsung pindah ke jalur lain kalau jalur sekarang sudah mati
+            failover = self.select_failover_connection(None if restarting else device_ip)
+            if failover and (restarting or failover[1] != device_ip):
+                if failover[1] != device_ip:
+                    self.ui.log(f"{Colors.SUCCESS}🔀 Pindah ke {type_styles[failover[2]]}{Colors.SUCCESS} ({failover[1]}){Colors.RESET}")
+                connection_name, device_ip, connection_type = failover
+                continue
+            if not failover:
+                self.journal.record("offline")
+                self.ui.update(self.device_key, state="offline")
+                self.ui.log(f"{Colors.WARNING}  ❌ Tidak ada perangkat yang dapat dihubungi{Colors.RESET}")
+
+            auto_reconnect_delay = self.config.auto_reconnect_delay
+            self.ui.log(f"{Colors.DIM}↳ Menghubungkan ulang dalam {auto_reconnect_delay} detik...{Colors.RESET}")
             
+            # Hitung mundur tampil di tabel status, bukan di log
             for i in range(auto_reconnect_delay, 0, -1):
-                print(f"{Colors.DIM}   {i}...{Colors.RESET}", end=' ', flush=True)
+                if self.stopped:
+                    break
+                self.ui.update(self.device_key, state="reconnecting", note=f"{i}s")
                 time.sleep(1)
-            print()
+
+        upgrade_monitor.stop()
+        keepalive.stop()
+        governor.detach(self)
+        with CONNECT_LOCKS[self.config.device_id]:
+            ACTIVE_TARGETS[self.config.device_id].pop(self.config.pipeline_id, None)
+
+class ConfigWatcher:
+    """Poll config.json and hand every valid edit to the fleet"""
+
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.last_seen = self.snapshot()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def snapshot(self):
+        try:
+            stat = os.stat(self.fleet.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def run(self):
+        while not self.stop_event.wait(self.fleet.config.config_reload_interval or 1):
+            current = self.snapshot()
+            if current is None or current == self.last_seen:
+                continue
+            self.last_seen = current
+
+            # File yang setengah tersimpan atau rusak tidak pernah menggantikan config yang berjalan
+            try:
+                config = ToolkitConfig.load(self.fleet.config_file, self.fleet.registry)
+            except ConfigError as e:
+                self.fleet.ui.log(f"{Colors.WARNING}⚠️  config.json berubah tapi tidak diterapkan:{Colors.RESET}")
+                for problem in e.problems:
+                    self.fleet.ui.log(f"{Colors.DIM}   ↳ {problem}{Colors.RESET}")
+                continue
+
+            self.fleet.apply_config(config)
+
+# Jeda restart worker yang crash berlipat dua sampai maksimal sekian detik
+WORKER_MAX_RESTART_DELAY = 60
+# Worker yang sudah jalan selama ini sebelum mati mulai lagi dari jeda terpendek
+WORKER_STABLE_SECONDS = 60
+
+class WorkerUI:
+    """Dashboard stand-in inside a worker process; forwards every call to the supervisor"""
+
+    def __init__(self, events):
+        self.events = events
+
+    def log(self, message=""):
+        self.events.put(("log", (message,), {}))
+
+    def update(self, device, **fields):
+        self.events.put(("update", (device,), fields))
+
+    def remove(self, device):
+        self.events.put(("remove", (device,), {}))
+
+def run_device_worker(values, events, commands, adb_gate, session_pid, server_port=None):
+    """Worker process entry point: one device pipeline, steered over a queue"""
+    # Ctrl+C sampai ke seluruh console; supervisor yang menentukan kapan worker berhenti
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ui = WorkerUI(events)
+    manager = ScrcpyManager(
+        DeviceConfig(values), ui, DeviceRegistry(), TailscaleResolver(values["tailscale_socket"]),
+        AdbScheduler(values["adb_concurrency"], adb_gate), server_port
+    )
+    manager.session_pid = session_pid
+
+    def run_pipeline():
+        try:
+            manager.main()
+        except Exception as e:
+            ui.log(f"{Colors.ERROR}❌ {manager.device_key}: pipeline crash: {e}{Colors.RESET}")
+
+    pipeline = threading.Thread(target=run_pipeline, daemon=True)
+    pipeline.start()
+
+    while pipeline.is_alive():
+        try:
+            command, args = commands.get(timeout=1)
+        except queue.Empty:
+            continue
+        if command == "reload":
+            manager.reload_config(DeviceConfig(args[0]), args[1])
+        elif command == "move":
+            manager.move_to_server(args[0])
+        elif command == "stop":
+            manager.stop()
+            return
+
+    # Pipeline berhenti sendiri - keluar dengan kode bukan nol supaya supervisor me-restart-nya
+    sys.exit(1)
+
+class DeviceWorker:
+    """Supervisor side of a device pipeline running in its own process"""
+
+    def __init__(self, device, context, events, ui, adb_gate, server_port=None):
+        self.device = device
+        self.context = context
+        self.events = events
+        self.ui = ui
+        self.adb_gate = adb_gate
+        self.server_port = server_port
+        self.process = None
+        self.commands = None
+        self.session_pid = None
+        self.stopped = False
+        self.crashes = 0
+        self.started_at = 0
+        self.restart_at = None
+
+    def start(self):
+        self.commands = self.context.Queue()
+        self.session_pid = self.context.RawValue("i", 0)
+        self.process = self.context.Process(
+            target=run_device_worker,
+            args=(self.device.values, self.events, self.commands, self.adb_gate, self.session_pid, self.server_port),
+            name=f"scrcpy-{self.device.pipeline_id}",
+            daemon=True
+        )
+        self.process.start()
+        self.started_at = time.time()
+        return self
+
+    def reload_config(self, device, restart):
+        self.device = device
+        self.commands.put(("reload", (device.values, restart)))
+
+    def move_to_server(self, server_port):
+        # Disimpan juga di sini, supaya worker yang restart setelah crash mulai di server baru
+        self.server_port = server_port
+        self.commands.put(("move", (server_port,)))
+
+    def stop(self):
+        """Ask the worker to stop its scrcpy session and exit; see join()"""
+        self.stopped = True
+        self.commands.put(("stop", ()))
+        self.ui.remove(self.device.key)
+
+    def join(self, timeout=5):
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+            self.kill_orphaned_session()
+
+    def kill_orphaned_session(self):
+        """End the scrcpy of a worker that died without stopping it, so no second session starts"""
+        pid = self.session_pid.value if self.session_pid else 0
+        if pid:
+            self.session_pid.value = 0
+        if pid and kill_process_group(pid):
+            self.ui.log(f"{Colors.WARNING}   ↳ {self.device.key}: scrcpy (pid {pid}) yang ditinggalkan worker sudah diakhiri{Colors.RESET}")
+
+    def check(self):
+        """Restart the worker after a crash, backing off while it keeps crashing"""
+        if self.stopped or self.process.is_alive():
+            return
+        now = time.time()
+        if self.restart_at is None:
+            if now - self.started_at >= WORKER_STABLE_SECONDS:
+                self.crashes = 0
+            self.crashes += 1
+            delay = min(2 ** self.crashes, WORKER_MAX_RESTART_DELAY)
+            self.restart_at = now + delay
+            self.ui.update(self.device.key, state="offline", note="worker crash")
+            self.ui.log(
+                f"{Colors.ERROR}💥 {self.device.key}: worker keluar dengan kode {self.process.exitcode}"
+                f" - restart dalam {delay} detik{Colors.RESET}"
+            )
+            self.kill_orphaned_session()
+        elif now >= self.restart_at:
+            self.restart_at = None
+            self.ui.update(self.device.key, note=None)
+            self.start()
+
+class FleetManager:
+    """Run one ScrcpyManager pipeline per configured device"""
+
+    def __init__(self, config_file="config.json", ui=None, registry=None):
+        self.ui = ui or Dashboard()
+        self.config_file = os.path.abspath(config_file)
+        self.registry = registry or DeviceRegistry()
+        self.config = self.load_config()
+        self.tailscale = TailscaleResolver(self.config.tailscale_socket)
+        self.adb = AdbScheduler(self.config.adb_concurrency)
+        self.setup_environment()
+        self.shards = None
+        if self.config.adb_servers > 1:
+            ports = range(self.config.adb_server_port, self.config.adb_server_port + self.config.adb_servers)
+            self.shards = AdbShards(ports, self.ui)
+            self.shards.on_change = self.rebalance
+        self.managers = {}
+        self.lock = threading.Lock()
+        self.context = None
+        self.events = None
+        self.adb_gate = None
+        if self.config.worker_processes:
+            # spawn, bukan fork: parent sudah menjalankan thread dashboard dan SQLite
+            self.context = multiprocessing.get_context("spawn")
+            self.events = self.context.Queue()
+            # Tiap worker punya scheduler sendiri; ini menjaga batas adb untuk semua perangkat
+            self.adb_gate = self.context.BoundedSemaphore(max(self.config.adb_concurrency, 1) * max(self.config.adb_servers, 1))
+
+    def load_config(self):
+        """Load and validate configuration from JSON file"""
+        try:
+            config = ToolkitConfig.load(self.config_file, self.registry)
+            self.ui.log(f"{Colors.SUCCESS}✅ Konfigurasi berhasil dimuat{Colors.RESET}")
+            return config
+        except ConfigError as e:
+            self.ui.log(f"{Colors.ERROR}❌ Gagal memuat konfigurasi: {e}{Colors.RESET}")
+            sys.exit(1)
+    
+    def setup_environment(self):
+        """Setup scrcpy environment and PATH"""
+        scrcpy_folder = self.config.scrcpy_folder
+        
+        if os.path.exists(scrcpy_folder):
+            os.chdir(scrcpy_folder)
+            # Add current directory to PATH for adb and scrcpy
+            os.environ['PATH'] = os.getcwd() + os.pathsep + os.environ['PATH']
+            self.ui.log(f"{Colors.SUCCESS}✅ Environment scrcpy disetup di: {os.getcwd()}{Colors.RESET}")
+        else:
+            self.ui.log(f"{Colors.ERROR}❌ Folder scrcpy tidak ditemukan: {scrcpy_folder}{Colors.RESET}")
+            sys.exit(1)
+
+    def start_device(self, device, handoff=None):
+        """Start a device pipeline on its own thread, or in its own process in worker mode"""
+        server_port = self.shards.port_for(device.device_id) if self.shards else None
+        if self.context:
+            manager = DeviceWorker(device, self.context, self.events, self.ui, self.adb_gate, server_port).start()
+        else:
+            manager = ScrcpyManager(device, self.ui, self.registry, self.tailscale, self.adb, server_port)
+            if handoff:
+                manager.adopt(handoff)
+            threading.Thread(target=manager.main, daemon=True).start()
+        self.managers[device.pipeline_id] = manager
+        return manager
+
+    def load_handoff(self):
+        """Sessions earlier runs left running, by pipeline id; reading the handoff file uses it up"""
+        try:
+            with open(HANDOFF_FILE, 'r', encoding='utf-8') as f:
+                sessions = json.load(f).get("sessions", {})
+            os.remove(HANDOFF_FILE)
+        except (OSError, ValueError, AttributeError):
+            sessions = {}
+
+        # Run yang crash tidak menyerahkan apa pun, tapi sesinya meninggalkan file state
+        try:
+            names = os.listdir(SESSIONS_DIR)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(".state"):
+                continue
+            path = os.path.join(SESSIONS_DIR, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if state.get("pipeline_id") in sessions:
+                continue
+            if not is_scrcpy_process(state.get("pid")):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                continue
+            # Posisi baca terakhir run yang crash tidak diketahui; hanya output baru yang dibaca
+            try:
+                state["offset"] = os.path.getsize(state["output"])
+            except OSError:
+                state["offset"] = 0
+            sessions[state["pipeline_id"]] = state
+        return sessions
+
+    def save_handoff(self, sessions):
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        write_json_file(HANDOFF_FILE, {"saved": time.time(), "sessions": sessions})
+
+    def rebalance(self):
+        """Move every pipeline whose adb server changed after a server went down or came back"""
+        with self.lock:
+            for device in self.config.devices:
+                manager = self.managers.get(device.pipeline_id)
+                server_port = self.shards.port_for(device.device_id)
+                if manager and manager.server_port != server_port:
+                    manager.move_to_server(server_port)
+
+    def supervise_workers(self):
+        """Forward dashboard calls from the workers and restart the ones that died"""
+        next_check = 0
+        while True:
+            try:
+                name, args, fields = self.events.get(timeout=1)
+            except queue.Empty:
+                pass
+            else:
+                if name in ("log", "update", "remove"):
+                    getattr(self.ui, name)(*args, **fields)
+
+            # Dicek berdasarkan waktu supaya worker yang ramai log tidak menunda restart
+            if time.time() >= next_check:
+                next_check = time.time() + 1
+                with self.lock:
+                    for worker in self.managers.values():
+                        worker.check()
+
+    def apply_config(self, config):
+        """Diff the new config against the running one and touch only affected devices"""
+        old_config = self.config
+        self.config = config
+        if config.scrcpy_folder != old_config.scrcpy_folder:
+            self.ui.log(f"{Colors.WARNING}⚠️  scrcpy_folder berubah - restart connector untuk memakainya{Colors.RESET}")
+        self.adb.resize(config.adb_concurrency)
+        if config.worker_processes != old_config.worker_processes:
+            self.ui.log(f"{Colors.WARNING}⚠️  worker_processes berubah - restart connector untuk memakainya{Colors.RESET}")
+        if (config.adb_servers, config.adb_server_port) != (old_config.adb_servers, old_config.adb_server_port):
+            self.ui.log(f"{Colors.WARNING}⚠️  adb_servers berubah - restart connector untuk memakainya{Colors.RESET}")
+
+        old_devices = {device.pipeline_id: device for device in old_config.devices}
+        new_ids = {device.pipeline_id for device in config.devices}
+
+        with self.lock:
+            for device in old_config.devices:
+                if device.pipeline_id not in new_ids:
+                    self.managers.pop(device.pipeline_id).stop()
+                    self.ui.log(f"{Colors.WARNING}➖ {device.key} dihapus dari config{Colors.RESET}")
+
+            for device in config.devices:
+                previous = old_devices.get(device.pipeline_id)
+                if previous is None:
+                    self.start_device(device)
+                    self.ui.log(f"{Colors.SUCCESS}➕ {device.key} ditambahkan dari config{Colors.RESET}")
+                    continue
+
+                changed = device.changed_fields(previous)
+                if not changed:
+                    continue
+                restart = any(field in SESSION_FIELDS for field in changed)
+                self.managers[device.pipeline_id].reload_config(device, restart)
+                action = "memulai ulang sesi" if restart else "diterapkan langsung"
+                self.ui.log(f"{Colors.PRIMARY}🔧 {device.key}: {', '.join(sorted(changed))} berubah - {action}{Colors.RESET}")
+
+    def shutdown(self):
+        """Stop every device pipeline and its scrcpy process, or hand the sessions to the next run"""
+        if self.shards:
+            self.shards.stop()
+        if self.config.session_handoff and not self.context:
+            with self.lock:
+                sessions = {}
+                for pipeline_id, manager in self.managers.items():
+                    state = manager.hand_off()
+                    if state:
+                        sessions[pipeline_id] = state
+                self.save_handoff(sessions)
+            self.ui.log(f"{Colors.SUCCESS}🤝 {len(sessions)} sesi dibiarkan berjalan untuk start berikutnya{Colors.RESET}")
+            self.ui.flush()
+            return
+        with self.lock:
+            for manager in self.managers.values():
+                manager.stop()
+            # Worker berhenti paralel; baru setelah itu tunggu semuanya
+            for manager in self.managers.values():
+                if isinstance(manager, DeviceWorker):
+                    manager.join()
+        self.ui.flush()
+
+    def main(self):
+        self.ui.log(f"\n{Colors.PRIMARY}✨ SCRCPY ULTIMATE CONNECTOR ✨{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+
+        if self.shards:
+            self.shards.start()
+
+        handoff = self.load_handoff()
+        adopting = self.config.session_handoff and not self.context
+        adoptable = {
+            device.pipeline_id: handoff.pop(device.pipeline_id)
+            for device in self.config.devices if adopting and device.pipeline_id in handoff
+        }
+        # Tidak ada yang mengambil alih sesi ini (perangkatnya sudah keluar dari config, atau handoff sudah
+        # dimatikan): hentikan sebelum sesi baru dari perangkat yang sama dimulai
+        leftovers = [AdoptedProcess(state["pid"]) for state in handoff.values() if is_scrcpy_process(state["pid"])]
+        for process in leftovers:
+            process.terminate()
+        deadline = time.time() + 3
+        for process in leftovers:
+            try:
+                process.wait(timeout=max(deadline - time.time(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for pipeline_id in handoff:
+            with contextlib.suppress(OSError):
+                os.remove(session_file_path(pipeline_id, "state"))
+        for device in self.config.devices:
+            self.start_device(device, adoptable.get(device.pipeline_id))
+
+        if self.config.config_reload_interval:
+            ConfigWatcher(self).start()
+
+        if self.context:
+            threading.Thread(target=self.supervise_workers, daemon=True).start()
+
+        # Pipeline perangkat jalan di thread masing-masing; tetap di sini untuk Ctrl+C
+        while True:
+            time.sleep(1)
+
+def interrupt(signum, frame):
+    raise KeyboardInterrupt
 
 if __name__ == "__main__":
+    # Service manager dan script deploy menghentikan connector dengan SIGTERM: perlakukan seperti Ctrl+C
+    signal.signal(signal.SIGTERM, interrupt)
+    fleet = None
     try:
-        manager = ScrcpyManager()
-        manager.main()
+        fleet = FleetManager()
+        fleet.main()
     except KeyboardInterrupt:
+        if fleet:
+            fleet.shutdown()
         print(f"\n{Colors.PRIMARY}✨ Terima kasih! ✨{Colors.RESET}")
\ No newline at end of file
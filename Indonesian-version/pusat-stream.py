@@ -0,0 +1,830 @@
+import os
+import subprocess
+import time
+import sys
+import json
+import socket
+import struct
+import random
+import shutil
+import argparse
+import threading
+import queue
+import base64
+import hashlib
+import importlib.util
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Epic Color Palette 🎨
+class Colors:
+    PRIMARY = '\033[96m'    # Soft Cyan
+    SUCCESS = '\033[92m'    # Soft Green
+    WARNING = '\033[93m'    # Soft Yellow
+    ERROR = '\033[91m'      # Soft Red
+    DEVICE = '\033[95m'     # Soft Magenta
+    PORT = '\033[94m'       # Soft Blue
+    DIM = '\033[90m'        # Gray
+    BOLD = '\033[1m'        # Bold
+    RESET = '\033[0m'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RECORDINGS_DIR = os.path.join(SCRIPT_DIR, "recordings")
+
+# Protokol socket scrcpy: codec meta berisi id codec, lebar, tinggi;
+# setiap paket punya header pts-dan-flag serta ukuran payload
+CODEC_META = struct.Struct(">III")
+PACKET_HEADER = struct.Struct(">QI")
+DEVICE_NAME_LENGTH = 64
+PACKET_FLAG_CONFIG = 1 << 63
+PACKET_FLAG_KEY_FRAME = 1 << 62
+
+# Konsumen yang tertinggal sebanyak ini paket melompat ke keyframe berikutnya
+CONSUMER_QUEUE_SIZE = 120
+# Server butuh waktu sebentar untuk listen setelah app_process berjalan
+SERVER_CONNECT_ATTEMPTS = 100
+SERVER_RESTART_DELAY = 3
+
+# RFC 6455: accept key adalah key klien ditambah GUID ini, lalu di-hash
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_BINARY = 0x2
+WEBSOCKET_CLOSE = 0x8
+# Browser yang mati tidak boleh menahan thread pengirim selamanya
+WEBSOCKET_SEND_TIMEOUT = 10
+# Buffer kernel kecil supaya penampil lambat terlihat sebagai backpressure, bukan jeda tersembunyi berdetik-detik
+WEBSOCKET_SEND_BUFFER = 256 * 1024
+
+# Penampil browser: WebCodecs men-decode di mesin penampil, host tidak menyentuh satu piksel pun
+VIEWER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>scrcpy stream hub</title>
+<style>
+body { margin: 0; background: #111; color: #ccc; font-family: sans-serif; }
+main { display: flex; flex-wrap: wrap; gap: 12px; padding: 12px; }
+figure { margin: 0; }
+canvas { display: block; max-width: 100%; max-height: 85vh; background: #000; }
+figcaption { padding: 4px 0; font-size: 13px; }
+</style>
+</head>
+<body>
+<main id="devices"></main>
+<script>
+const DEVICES = __DEVICES__;
+
+// "avc1.PPCCLL" from the SPS: profile, constraint flags and level
+function codecString(config) {
+  for (let i = 0; i + 6 < config.length; i++) {
+    if (config[i] === 0 && config[i + 1] === 0 && config[i + 2] === 1 && (config[i + 3] & 0x1f) === 7) {
+      return "avc1." + [config[i + 4], config[i + 5], config[i + 6]].map(b => b.toString(16).padStart(2, "0")).join("");
+    }
+  }
+  return null;
+}
+
+function watch(serial) {
+  const figure = document.createElement("figure");
+  const canvas = document.createElement("canvas");
+  const caption = document.createElement("figcaption");
+  caption.textContent = `${serial} - menghubungkan`;
+  figure.append(canvas, caption);
+  document.getElementById("devices").append(figure);
+  const context = canvas.getContext("2d");
+
+  let decoder = null;
+  let config = null;
+  let meta = false;
+  let waitingForKey = true;
+  const socket = new WebSocket(`ws://${location.host}/ws/${encodeURIComponent(serial)}`);
+  socket.binaryType = "arraybuffer";
+
+  socket.onmessage = event => {
+    const data = new DataView(event.data);
+    if (!meta) {
+      // First message: codec id, width, height
+      meta = true;
+      const codec = String.fromCharCode(...new Uint8Array(event.data, 0, 4));
+      caption.textContent = `${serial} - ${codec} ${data.getUint32(4)}x${data.getUint32(8)}`;
+      return;
+    }
+
+    const high = data.getUint32(0);
+    const payload = new Uint8Array(event.data, 12);
+    if (high & 0x80000000) {
+      config = payload.slice();
+      if (decoder && decoder.state !== "closed") decoder.close();
+      decoder = new VideoDecoder({
+        output: frame => {
+          if (canvas.width !== frame.displayWidth || canvas.height !== frame.displayHeight) {
+            canvas.width = frame.displayWidth;
+            canvas.height = frame.displayHeight;
+          }
+          context.drawImage(frame, 0, 0);
+          frame.close();
+        },
+        error: e => { caption.textContent = `${serial} - ${e.message}`; },
+      });
+      decoder.configure({ codec: codecString(config), optimizeForLatency: true });
+      waitingForKey = true;
+      return;
+    }
+    if (!decoder || decoder.state !== "configured") return;
+
+    const key = (high & 0x40000000) !== 0;
+    // A slow decoder skips to the next keyframe instead of queueing
+    if (!key && decoder.decodeQueueSize > 3) waitingForKey = true;
+    if (waitingForKey && !key) return;
+    waitingForKey = false;
+
+    let chunk = payload;
+    if (key) {
+      chunk = new Uint8Array(config.length + payload.length);
+      chunk.set(config);
+      chunk.set(payload, config.length);
+    }
+    const timestamp = (high & 0x3fffffff) * 4294967296 + data.getUint32(4);
+    decoder.decode(new EncodedVideoChunk({ type: key ? "key" : "delta", timestamp, data: chunk }));
+  };
+
+  socket.onclose = () => {
+    if (decoder && decoder.state !== "closed") decoder.close();
+    caption.textContent = `${serial} - terputus, mencoba lagi`;
+    setTimeout(() => { figure.remove(); watch(serial); }, 2000);
+  };
+}
+
+if (!("VideoDecoder" in window)) {
+  document.getElementById("devices").textContent =
+    "Browser ini tidak bisa men-decode di sini: WebCodecs butuh Chrome, Edge atau Safari terbaru, dibuka lewat https atau di localhost.";
+} else {
+  DEVICES.forEach(watch);
+}
+</script>
+</body>
+</html>
+"""
+
+def load_connector():
+    """Load jalankan-scrcpy.py as a module (its dash keeps it from a plain import)"""
+    spec = importlib.util.spec_from_file_location("run_scrcpy", os.path.join(SCRIPT_DIR, "jalankan-scrcpy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def parse_bit_rate(value):
+    """"8M" / "800K" / "8000000" as bits per second"""
+    value = value.strip().upper()
+    multiplier = {"K": 1000, "M": 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip("KM")) * multiplier)
+
+def receive_exactly(sock, size):
+    """Read size bytes into one fresh buffer; it is never copied again"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if not count:
+            raise ConnectionError("stream ditutup oleh perangkat")
+        received += count
+    return buffer
+
+class StreamPacket:
+    """One encoded packet exactly as the server sent it; shared by every consumer"""
+    __slots__ = ("header", "payload", "is_config", "is_key_frame")
+
+    def __init__(self, header, payload, flags):
+        self.header = header
+        self.payload = memoryview(payload)
+        self.is_config = bool(flags & PACKET_FLAG_CONFIG)
+        self.is_key_frame = bool(flags & PACKET_FLAG_KEY_FRAME)
+
+class StreamConsumer:
+    """Bounded queue drained by its own thread; a consumer that falls behind skips to the next keyframe"""
+
+    # Buang apa pun yang masih antre begitu keyframe yang lebih baru tiba
+    latest_key_frame_only = False
+
+    def __init__(self, name):
+        self.name = name
+        self.packets = queue.Queue(CONSUMER_QUEUE_SIZE)
+        self.waiting_for_key_frame = True
+        self.closed = False
+        self.on_close = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self, codec, config_packet):
+        self.begin(codec)
+        if config_packet is not None:
+            self.packets.put(config_packet)
+        self.thread.start()
+        return self
+
+    def offer(self, packet):
+        """Called by the device reader; never blocks it"""
+        if self.closed:
+            return
+        if self.waiting_for_key_frame and not (packet.is_config or packet.is_key_frame):
+            return
+        if packet.is_key_frame:
+            self.waiting_for_key_frame = False
+            if self.latest_key_frame_only and not self.packets.empty():
+                # Masih tertinggal: tidak ada yang antre sebelum keyframe ini yang layak ditampilkan
+                self.drain()
+        try:
+            self.packets.put_nowait(packet)
+        except queue.Full:
+            # Buang antrean daripada menambah latensi; lanjut di keyframe berikutnya
+            self.drain()
+            self.waiting_for_key_frame = True
+
+    def drain(self):
+        """Empty the queue, keeping config packets (the decoder needs them) and the stop marker"""
+        kept = []
+        try:
+            while True:
+                packet = self.packets.get_nowait()
+                if packet is None or packet.is_config:
+                    kept.append(packet)
+        except queue.Empty:
+            pass
+        for packet in kept:
+            self.packets.put_nowait(packet)
+
+    def run(self):
+        try:
+            while not self.closed:
+                packet = self.packets.get()
+                if packet is None:
+                    break
+                self.write(packet)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.packets.put_nowait(None)
+        except queue.Full:
+            # Thread pengirim melihat status tertutup setelah paketnya saat ini
+            pass
+        self.finish()
+        if self.on_close:
+            self.on_close(self)
+
+    def begin(self, codec):
+        pass
+
+    def write(self, packet):
+        pass
+
+    def finish(self):
+        pass
+
+class TcpSubscriber(StreamConsumer):
+    """Raw scrcpy framing to a TCP client: codec meta once, then header + payload per packet"""
+
+    def __init__(self, connection, address):
+        super().__init__(f"tcp {address[0]}:{address[1]}")
+        self.connection = connection
+
+    def begin(self, codec):
+        self.connection.sendall(codec)
+
+    def write(self, packet):
+        if hasattr(self.connection, "sendmsg"):
+            # Scatter-gather: header dan payload dikirim langsung dari buffer masing-masing
+            sent = self.connection.sendmsg([packet.header, packet.payload])
+            if sent < len(packet.header):
+                self.connection.sendall(packet.header[sent:])
+                sent = len(packet.header)
+            self.connection.sendall(packet.payload[sent - len(packet.header):])
+        else:
+            self.connection.sendall(packet.header)
+            self.connection.sendall(packet.payload)
+
+    def finish(self):
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+class WebSocketSubscriber(StreamConsumer):
+    """Browser viewer: the same framing as TcpSubscriber, one WebSocket message per packet"""
+
+    latest_key_frame_only = True
+
+    def __init__(self, connection, address):
+        super().__init__(f"web {address[0]}:{address[1]}")
+        self.connection = connection
+        self.connection.settimeout(WEBSOCKET_SEND_TIMEOUT)
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, WEBSOCKET_SEND_BUFFER)
+
+    def frame_header(self, size, opcode=WEBSOCKET_BINARY):
+        """Unmasked server frame header for a payload of size bytes"""
+        if size < 126:
+            return struct.pack(">BB", 0x80 | opcode, size)
+        if size < 1 << 16:
+            return struct.pack(">BBH", 0x80 | opcode, 126, size)
+        return struct.pack(">BBQ", 0x80 | opcode, 127, size)
+
+    def begin(self, codec):
+        self.connection.sendall(self.frame_header(len(codec)) + codec)
+
+    def write(self, packet):
+        parts = [self.frame_header(len(packet.header) + len(packet.payload)), packet.header, packet.payload]
+        if not hasattr(self.connection, "sendmsg"):
+            for part in parts:
+                self.connection.sendall(part)
+            return
+        # Header frame, header paket dan payload dikirim dalam satu panggilan, langsung dari buffernya
+        sent = self.connection.sendmsg(parts)
+        for part in parts:
+            if sent >= len(part):
+                sent -= len(part)
+                continue
+            self.connection.sendall(part[sent:])
+            sent = 0
+
+    def wait_closed(self):
+        """Read the browser's frames until it leaves; all it may send is pings and a close"""
+        try:
+            while not self.closed:
+                # Timeout kirim berlaku untuk seluruh socket, termasuk baca; timeout itu harus tetap ada,
+                # jadi browser yang diam hanya berarti satu putaran lagi (dan cek self.closed)
+                try:
+                    header = self.connection.recv(2)
+                except socket.timeout:
+                    continue
+                if len(header) < 2 or header[0] & 0x0F == WEBSOCKET_CLOSE:
+                    break
+                size = header[1] & 0x7F
+                if size == 126:
+                    size = struct.unpack(">H", receive_exactly(self.connection, 2))[0]
+                elif size == 127:
+                    size = struct.unpack(">Q", receive_exactly(self.connection, 8))[0]
+                # Mask key dan payload, keduanya tidak diperlukan di sini
+                receive_exactly(self.connection, 4 + size)
+        except (OSError, ConnectionError):
+            pass
+        self.close()
+
+    def finish(self):
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+class RecorderConsumer(StreamConsumer):
+    """Raw H.264/H.265 elementary stream on disk (remux with: ffmpeg -i file -c copy out.mp4)"""
+
+    def __init__(self, path):
+        super().__init__(f"record {os.path.basename(path)}")
+        self.path = path
+        self.file = None
+
+    def begin(self, codec):
+        self.file = open(self.path, "wb")
+
+    def write(self, packet):
+        self.file.write(packet.payload)
+
+    def finish(self):
+        if self.file:
+            self.file.close()
+
+class DisplayConsumer(StreamConsumer):
+    """Local window through ffplay, fed the elementary stream on stdin"""
+
+    def __init__(self, title, codec_name):
+        super().__init__(f"display {title}")
+        self.title = title
+        self.codec_name = codec_name
+        self.process = None
+
+    def begin(self, codec):
+        input_format = "hevc" if self.codec_name == "h265" else "h264"
+        self.process = subprocess.Popen(
+            [
+                "ffplay", "-loglevel", "error", "-fflags", "nobuffer", "-flags", "low_delay", "-framedrop",
+                "-window_title", self.title, "-f", input_format, "-",
+            ],
+            stdin=subprocess.PIPE
+        )
+
+    def write(self, packet):
+        self.process.stdin.write(packet.payload)
+        self.process.stdin.flush()
+
+    def finish(self):
+        if self.process:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            self.process.terminate()
+
+class DeviceStream:
+    """One scrcpy-server session on a device, its packets fanned out to every consumer"""
+
+    def __init__(self, manager, serial, ui, keyframe_interval=2, video_codec=None, env=None):
+        self.manager = manager
+        self.serial = serial
+        self.ui = ui
+        self.keyframe_interval = keyframe_interval
+        self.video_codec = video_codec
+        # Mengarahkan adb shell milik server ke server adb yang dipakai perangkat
+        self.env = env
+        self.consumers = []
+        self.lock = threading.Lock()
+        self.codec = None
+        self.codec_name = None
+        self.config_packet = None
+        self.server = None
+        self.local_port = None
+        self.video_socket = None
+        self.stopped = False
+        self.ready = threading.Event()
+
+    def server_options(self, scid):
+        config = self.manager.config
+        options = [
+            f"scid={scid:08x}", "log_level=info", "audio=false", "control=false",
+            "tunnel_forward=true", "cleanup=false", f"max_size={config.max_size}",
+        ]
+        if config.max_fps:
+            options.append(f"max_fps={config.max_fps}")
+        if config.video_bit_rate:
+            options.append(f"video_bit_rate={parse_bit_rate(config.video_bit_rate)}")
+
+        codec, encoder = config.video_codec, config.video_encoder
+        if not (codec or encoder) and self.manager.encoder:
+            codec, encoder = self.manager.encoder
+        if self.video_codec and codec != self.video_codec:
+            # Browser men-decode H.264 di mana saja; encoder untuk codec lain tidak bisa dipakai
+            codec, encoder = self.video_codec, ""
+        if codec:
+            options.append(f"video_codec={codec}")
+        if encoder:
+            options.append(f"video_encoder={encoder}")
+        if self.keyframe_interval:
+            # Konsumen baru mulai di keyframe; keyframe yang sering membuat tunggunya singkat
+            options.append(f"video_codec_options=i-frame-interval={self.keyframe_interval}")
+        return options
+
+    def start_server(self):
+        """Launch the staged server and open its video socket"""
+        self.manager.stage_server(self.serial)
+        self.manager.select_encoder(self.serial)
+        info = self.manager.get_server_info()
+        if not info['version'] or not self.manager.is_server_staged(self.serial):
+            raise RuntimeError("scrcpy-server tidak bisa di-stage di perangkat")
+
+        scid = random.getrandbits(31)
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.local_port = probe.getsockname()[1]
+        self.manager.run_command(
+            f"adb -s {self.serial} forward tcp:{self.local_port} localabstract:scrcpy_{scid:08x}", silent=True, timeout=10
+        )
+
+        self.server = subprocess.Popen(
+            [
+                "adb", "-s", self.serial, "shell", f"CLASSPATH={info['device_path']}",
+                "app_process", "/", "com.genymobile.scrcpy.Server", info['version'], *self.server_options(scid),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            env=self.env
+        )
+        threading.Thread(target=self.log_server_output, args=(self.server,), daemon=True).start()
+
+        # adb langsung menerima forward bahkan sebelum server listen;
+        # hanya dummy byte yang membuktikan server benar-benar ada
+        for _ in range(SERVER_CONNECT_ATTEMPTS):
+            if self.server.poll() is not None:
+                break
+            sock = socket.create_connection(("127.0.0.1", self.local_port), timeout=5)
+            try:
+                if sock.recv(1):
+                    sock.settimeout(None)
+                    self.video_socket = sock
+                    return
+            except OSError:
+                pass
+            sock.close()
+            time.sleep(0.1)
+        raise RuntimeError("scrcpy-server tidak menjawab")
+
+    def log_server_output(self, server):
+        for line in server.stdout:
+            if "ERROR" in line or "WARN" in line:
+                self.ui.log(f"{Colors.DIM}   [{self.serial}] {line.rstrip()}{Colors.RESET}")
+
+    def stop_server(self):
+        if self.video_socket:
+            try:
+                self.video_socket.close()
+            except OSError:
+                pass
+            self.video_socket = None
+        if self.server:
+            self.manager.stop_process(self.server)
+            self.server = None
+        if self.local_port:
+            self.manager.run_command(f"adb -s {self.serial} forward --remove tcp:{self.local_port}", silent=True, timeout=5)
+            self.local_port = None
+
+    def read_stream(self):
+        device_name = receive_exactly(self.video_socket, DEVICE_NAME_LENGTH).split(b"\0", 1)[0].decode("utf-8", "replace")
+        codec = bytes(receive_exactly(self.video_socket, CODEC_META.size))
+        codec_id, width, height = CODEC_META.unpack(codec)
+        with self.lock:
+            self.codec = codec
+            self.codec_name = codec_id.to_bytes(4, "big").strip(b"\0").decode("ascii", "replace")
+            self.config_packet = None
+        self.ready.set()
+        self.ui.log(
+            f"{Colors.SUCCESS}📡 {Colors.DEVICE}{self.serial}{Colors.SUCCESS} streaming {device_name} "
+            f"{Colors.PORT}{self.codec_name} {width}x{height}{Colors.RESET}"
+        )
+
+        while not self.stopped:
+            header = bytes(receive_exactly(self.video_socket, PACKET_HEADER.size))
+            flags, size = PACKET_HEADER.unpack(header)
+            packet = StreamPacket(header, receive_exactly(self.video_socket, size), flags)
+            if packet.is_config:
+                # Disimpan untuk konsumen yang bergabung nanti; decoder membutuhkannya lebih dulu
+                with self.lock:
+                    self.config_packet = packet
+            with self.lock:
+                consumers = list(self.consumers)
+            for consumer in consumers:
+                consumer.offer(packet)
+
+    def run(self):
+        """Keep one server session up; consumers stay attached across restarts"""
+        while not self.stopped:
+            try:
+                self.start_server()
+                self.read_stream()
+            except (OSError, RuntimeError, ConnectionError) as e:
+                if not self.stopped:
+                    self.ui.log(f"{Colors.WARNING}⚠️  {self.serial}: {e} - restart dalam {SERVER_RESTART_DELAY} detik{Colors.RESET}")
+            finally:
+                self.stop_server()
+            if not self.stopped:
+                time.sleep(SERVER_RESTART_DELAY)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+        self.stop_server()
+        with self.lock:
+            consumers = list(self.consumers)
+        for consumer in consumers:
+            consumer.close()
+
+    def attach(self, consumer):
+        """Add a consumer; it gets the codec header and config packet, then joins at a keyframe"""
+        self.ready.wait()
+        with self.lock:
+            self.consumers.append(consumer)
+            codec, config_packet = self.codec, self.config_packet
+        consumer.on_close = self.detach
+        consumer.start(codec, config_packet)
+        self.ui.log(f"{Colors.PRIMARY}➕ {self.serial}: {consumer.name} terpasang{Colors.RESET}")
+        return consumer
+
+    def detach(self, consumer):
+        with self.lock:
+            if consumer not in self.consumers:
+                return
+            self.consumers.remove(consumer)
+        self.ui.log(f"{Colors.DIM}➖ {self.serial}: {consumer.name} dilepas{Colors.RESET}")
+
+class HubRequestHandler(BaseHTTPRequestHandler):
+    """Viewer page on /, one device's stream as a WebSocket on /ws/<serial>"""
+
+    # Browser hanya menerima upgrade WebSocket dari respons HTTP/1.1
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        hub = self.server.hub
+        if self.path.startswith("/ws/"):
+            self.open_websocket(hub.streams.get(urllib.parse.unquote(self.path[len("/ws/"):])))
+        elif self.path in ("/", "/index.html"):
+            body = VIEWER_PAGE.replace("__DEVICES__", json.dumps(sorted(hub.streams))).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def open_websocket(self, stream):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if stream is None or not key or self.headers.get("Upgrade", "").lower() != "websocket":
+            self.send_error(404)
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        subscriber = stream.attach(WebSocketSubscriber(self.connection, self.client_address))
+        # Thread request ini menemani browser sampai ia pergi
+        subscriber.wait_closed()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Pasang dan lepas sudah dicatat; baris request tidak perlu masuk dashboard
+        pass
+
+class StreamHub:
+    """Serve every device's single stream to local consumers"""
+
+    def __init__(self, config_file="config.json", keyframe_interval=2):
+        self.connector = load_connector()
+        self.config_file = config_file
+        self.config = self.load_config(config_file)
+        self.ui = self.connector.Dashboard()
+        self.registry = self.connector.DeviceRegistry()
+        # Batas adb dan server adb yang sama dengan connector, supaya memulai banyak stream tidak membanjiri mereka
+        self.adb = self.connector.AdbScheduler(int(self.config.get("adb_concurrency", 4)))
+        servers = int(self.config.get("adb_servers", 1))
+        first_port = int(self.config.get("adb_server_port", 5037))
+        self.server_ports = list(range(first_port, first_port + servers)) if servers > 1 else [None]
+        self.keyframe_interval = keyframe_interval
+        self.streams = {}
+        self.setup_environment()
+
+    def load_config(self, config_file):
+        """Load configuration from JSON file"""
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"{Colors.WARNING}⚠️  Tidak bisa membaca {config_file}: {e}{Colors.RESET}")
+            return {}
+
+    def setup_environment(self):
+        """Setup scrcpy environment and PATH"""
+        scrcpy_folder = self.config.get("scrcpy_folder", "scrcpy-win64-v3.3.3")
+
+        if os.path.exists(scrcpy_folder):
+            self.config_file = os.path.abspath(self.config_file)
+            os.chdir(scrcpy_folder)
+            # Add current directory to PATH for adb and scrcpy
+            os.environ['PATH'] = os.getcwd() + os.pathsep + os.environ['PATH']
+        else:
+            print(f"{Colors.ERROR}❌ Folder scrcpy tidak ditemukan: {scrcpy_folder}{Colors.RESET}")
+            sys.exit(1)
+
+    def device_config(self, serial):
+        """The device's entry in config.json, or the defaults for a device that is not listed"""
+        connector = self.connector
+        hardware_serial = self.registry.find_by_address(serial) or serial
+        try:
+            config = connector.ToolkitConfig.load(self.config_file, self.registry)
+            # Layar ponsel sendiri dulu; profil display virtual hanya jika hanya itu yang ada
+            for device in sorted(config.devices, key=lambda device: device.display is not None):
+                if device.device_id == hardware_serial:
+                    return device
+            settings = config.settings
+        except connector.ConfigError:
+            settings = {key: default for key, (_, default) in connector.SETTINGS_SCHEMA.items()}
+
+        values = {key: default for key, (_, default) in connector.DEVICE_SCHEMA.items() if default is not connector.REQUIRED}
+        values.update(settings)
+        values["device_id"] = hardware_serial
+        return connector.DeviceConfig(values)
+
+    def list_devices(self):
+        """Every transport an adb server sees as "device", mapped to that server's port"""
+        serials = {}
+        for server_port in self.server_ports:
+            try:
+                output = self.adb.run("adb devices", timeout=10, server_port=server_port).stdout
+            except subprocess.TimeoutExpired:
+                self.ui.log(f"{Colors.WARNING}⚠️  Server adb :{server_port} tidak menjawab{Colors.RESET}")
+                continue
+            for line in output.strip().split('\n')[1:]:
+                parts = line.split('\t')
+                if len(parts) >= 2 and parts[1].strip() == "device":
+                    serials.setdefault(parts[0].strip(), server_port)
+        return serials
+
+    def serve_tcp(self, stream, bind, port):
+        """Accept TCP subscribers for one device stream"""
+        server = socket.socket()
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((bind, port))
+        server.listen()
+        while not stream.stopped:
+            connection, address = server.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=stream.attach, args=(TcpSubscriber(connection, address),), daemon=True).start()
+
+    def serve_web(self, bind, port):
+        """Viewer page and WebSocket streams for browsers"""
+        server = ThreadingHTTPServer((bind, port), HubRequestHandler)
+        server.daemon_threads = True
+        server.hub = self
+        server.serve_forever()
+
+    def main(self, serials=None, bind="127.0.0.1", base_port=27200, record_dir=None, display=False, web_port=None):
+        self.ui.log(f"\n{Colors.PRIMARY}📡 PUSAT STREAM SCRCPY{Colors.RESET}")
+        self.ui.log(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+
+        if serials:
+            # Disebut di command line: dicari di server adb mana pun yang memegangnya
+            known = self.list_devices()
+            serials = {serial: known.get(serial, self.server_ports[0]) for serial in serials}
+        else:
+            serials = self.list_devices()
+        if not serials:
+            self.ui.log(f"{Colors.ERROR}❌ Tidak ada perangkat yang terdeteksi{Colors.RESET}")
+            return 1
+        if display and not shutil.which("ffplay"):
+            self.ui.log(f"{Colors.WARNING}⚠️  ffplay tidak ditemukan - tanpa jendela tampilan{Colors.RESET}")
+            display = False
+
+        for index, serial in enumerate(serials):
+            server_port = serials[serial]
+            manager = self.connector.ScrcpyManager(
+                self.device_config(serial), self.ui, self.registry, adb=self.adb, server_port=server_port
+            )
+            # Browser hanya bisa diandalkan untuk H.264
+            stream = DeviceStream(
+                manager, serial, self.ui, self.keyframe_interval, "h264" if web_port else None,
+                self.connector.adb_server_env(server_port)
+            ).start()
+            self.streams[serial] = stream
+
+            port = base_port + index
+            threading.Thread(target=self.serve_tcp, args=(stream, bind, port), daemon=True).start()
+            self.ui.log(f"{Colors.PRIMARY}🔌 {Colors.DEVICE}{serial}{Colors.PRIMARY} → tcp://{bind}:{Colors.PORT}{port}{Colors.RESET}")
+
+            if record_dir or display:
+                threading.Thread(target=self.attach_local, args=(stream, record_dir, display), daemon=True).start()
+
+        if web_port:
+            threading.Thread(target=self.serve_web, args=(bind, web_port), daemon=True).start()
+            host = "localhost" if bind in ("127.0.0.1", "0.0.0.0") else bind
+            self.ui.log(f"{Colors.PRIMARY}🌐 Tampilan browser → http://{host}:{Colors.PORT}{web_port}{Colors.RESET}")
+
+        while True:
+            time.sleep(1)
+
+    def attach_local(self, stream, record_dir, display):
+        stream.ready.wait()
+        if record_dir and stream.codec_name in ("h264", "h265"):
+            os.makedirs(record_dir, exist_ok=True)
+            name = f"{stream.serial.replace(':', '_')}-{time.strftime('%Y%m%d-%H%M%S')}.{stream.codec_name}"
+            stream.attach(RecorderConsumer(os.path.join(record_dir, name)))
+        if display and stream.codec_name in ("h264", "h265"):
+            stream.attach(DisplayConsumer(stream.serial, stream.codec_name))
+
+    def shutdown(self):
+        for stream in self.streams.values():
+            stream.stop()
+        self.ui.flush()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream setiap perangkat sekali dan bagikan ke beberapa penampil, perekam dan alat.")
+    parser.add_argument("serials", nargs="*", help="serial adb yang di-stream (default: semua perangkat terhubung)")
+    parser.add_argument("--bind", default="127.0.0.1", help="alamat untuk pelanggan TCP dan tampilan browser (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=27200, help="port TCP perangkat pertama; perangkat berikutnya naik satu per satu")
+    parser.add_argument("--record", nargs="?", const=RECORDINGS_DIR, help="rekam juga setiap stream (folder default: recordings/)")
+    parser.add_argument("--display", action="store_true", help="tampilkan juga setiap stream di jendela ffplay")
+    parser.add_argument("--web", nargs="?", type=int, const=8080, help="sajikan tampilan browser di port ini (default: 8080); stream menjadi H.264")
+    parser.add_argument("--keyframe-interval", type=int, default=2, help="detik antar keyframe, supaya penampil baru cepat mulai")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    record_dir = os.path.abspath(args.record) if args.record else None
+    hub = None
+    try:
+        hub = StreamHub(keyframe_interval=args.keyframe_interval)
+        sys.exit(hub.main(args.serials, args.bind, args.port, record_dir, args.display, args.web))
+    except KeyboardInterrupt:
+        if hub:
+            hub.shutdown()
+        print(f"\n{Colors.PRIMARY}✨ Terima kasih! ✨{Colors.RESET}")
@@ -0,0 +1,179 @@
+import os
+import subprocess
+import time
+import sys
+import json
+import argparse
+import struct
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# Epic Color Palette 🎨
+class Colors:
+    PRIMARY = '\033[96m'    # Soft Cyan
+    SUCCESS = '\033[92m'    # Soft Green
+    WARNING = '\033[93m'    # Soft Yellow
+    ERROR = '\033[91m'      # Soft Red
+    DEVICE = '\033[95m'     # Soft Magenta
+    PORT = '\033[94m'       # Soft Blue
+    DIM = '\033[90m'        # Gray
+    BOLD = '\033[1m'        # Bold
+    RESET = '\033[0m'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCREENSHOT_DIR = os.path.join(SCRIPT_DIR, "screenshots")
+
+# Awal screencap raw: lebar, tinggi dan format piksel (Android 9+ menambah color space)
+RAW_HEADER = struct.Struct("<III")
+
+def load_connector():
+    """Load jalankan-scrcpy.py as a module (its dash keeps it from a plain import)"""
+    spec = importlib.util.spec_from_file_location("run_scrcpy", os.path.join(SCRIPT_DIR, "jalankan-scrcpy.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class FleetCapture:
+    """Take a screenshot of many devices at once"""
+
+    def __init__(self, config_file="config.json", jobs=16, timeout=15):
+        self.config = self.load_config(config_file)
+        self.adb = load_connector().AdbScheduler(jobs)
+        self.timeout = timeout
+        self.setup_environment()
+
+    def load_config(self, config_file):
+        """Load configuration from JSON file"""
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"{Colors.WARNING}⚠️  Tidak bisa membaca {config_file}: {e}{Colors.RESET}")
+            return {}
+
+    def setup_environment(self):
+        """Setup scrcpy environment and PATH"""
+        scrcpy_folder = self.config.get("scrcpy_folder", "scrcpy-win64-v3.3.3")
+
+        if os.path.exists(scrcpy_folder):
+            os.chdir(scrcpy_folder)
+            # Add current directory to PATH for adb
+            os.environ['PATH'] = os.getcwd() + os.pathsep + os.environ['PATH']
+        else:
+            print(f"{Colors.ERROR}❌ Folder scrcpy tidak ditemukan: {scrcpy_folder}{Colors.RESET}")
+            sys.exit(1)
+
+    def list_devices(self):
+        """Serials of every transport adb sees as "device" """
+        output = self.adb.run("adb devices", timeout=10).stdout
+        serials = []
+        for line in output.strip().split('\n')[1:]:
+            parts = line.split('\t')
+            if len(parts) >= 2 and parts[1].strip() == "device":
+                serials.append(parts[0].strip())
+        return serials
+
+    def capture(self, serial, output_dir, raw=False):
+        """Stream one screenshot into a file and report how long it took"""
+        extension = "raw" if raw else "png"
+        path = os.path.join(output_dir, f"{serial.replace(':', '_')}.{extension}")
+        cmd = f"adb -s {serial} exec-out screencap" + ("" if raw else " -p")
+
+        started = time.time()
+        error = ""
+        try:
+            with open(path, "wb") as f:
+                # adb menulis langsung ke file; gambar tidak pernah lewat Python
+                result = self.adb.run(cmd, timeout=self.timeout, stdout=f)
+            if result.returncode != 0:
+                error = result.stderr.strip() or f"adb keluar dengan kode {result.returncode}"
+        except subprocess.TimeoutExpired:
+            error = f"timeout setelah {self.timeout} detik"
+        except OSError as e:
+            error = str(e)
+        seconds = time.time() - started
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if not error and size == 0:
+            error = "screenshot kosong"
+        if error and os.path.exists(path):
+            os.remove(path)
+
+        return {
+            'serial': serial,
+            'path': path,
+            'ok': not error,
+            'error': error,
+            'seconds': seconds,
+            'bytes': size,
+            'resolution': self.read_raw_resolution(path) if raw and not error else None,
+        }
+
+    def read_raw_resolution(self, path):
+        """Width x height from the raw screencap header"""
+        with open(path, "rb") as f:
+            header = f.read(RAW_HEADER.size)
+        if len(header) < RAW_HEADER.size:
+            return None
+        width, height, _ = RAW_HEADER.unpack(header)
+        return f"{width}x{height}"
+
+    def capture_all(self, serials, output_dir, raw=False):
+        """Capture every device concurrently; the adb scheduler bounds the load"""
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max(len(serials), 1)) as pool:
+            return list(pool.map(lambda serial: self.capture(serial, output_dir, raw), serials))
+
+    def print_result(self, result):
+        if result['ok']:
+            details = f"{result['bytes'] / 1024:.0f} KB"
+            if result['resolution']:
+                details += f" • {result['resolution']}"
+            print(
+                f"  {Colors.SUCCESS}✅ {Colors.DEVICE}{result['serial']}{Colors.RESET} "
+                f"{Colors.PORT}{result['seconds'] * 1000:.0f} ms{Colors.RESET} {Colors.DIM}{details}{Colors.RESET}"
+            )
+        else:
+            print(f"  {Colors.ERROR}❌ {result['serial']}: {result['error']}{Colors.RESET}")
+
+    def main(self, serials=None, output_dir=None, raw=False):
+        print(f"\n{Colors.PRIMARY}📸 SCREENSHOT SEMUA PERANGKAT{Colors.RESET}")
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+
+        serials = serials or self.list_devices()
+        if not serials:
+            print(f"{Colors.ERROR}❌ Tidak ada perangkat yang terdeteksi{Colors.RESET}")
+            return 1
+
+        output_dir = output_dir or os.path.join(SCREENSHOT_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        started = time.time()
+        results = self.capture_all(serials, output_dir, raw)
+        elapsed = time.time() - started
+
+        for result in results:
+            self.print_result(result)
+
+        captured = sum(1 for result in results if result['ok'])
+        color = Colors.SUCCESS if captured == len(results) else Colors.WARNING
+        print(f"{Colors.DIM}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.RESET}")
+        print(f"{color}📸 {captured}/{len(results)} perangkat dalam {elapsed:.1f} detik{Colors.RESET}")
+        print(f"{Colors.DIM}   ↳ Disimpan di {output_dir}{Colors.RESET}")
+        return 0 if captured == len(results) else 1
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ambil screenshot semua perangkat yang terhubung sekaligus.")
+    parser.add_argument("serials", nargs="*", help="serial adb yang diambil (default: semua perangkat terhubung)")
+    parser.add_argument("--raw", action="store_true", help="simpan framebuffer mentah, bukan PNG (jauh lebih cepat)")
+    parser.add_argument("--output", help="folder untuk screenshot (default: screenshots/<waktu>)")
+    parser.add_argument("--jobs", type=int, default=16, help="berapa perangkat yang diambil bersamaan")
+    parser.add_argument("--timeout", type=int, default=15, help="berapa detik menunggu satu perangkat")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    output_dir = os.path.abspath(args.output) if args.output else None
+    try:
+        capture = FleetCapture(jobs=args.jobs, timeout=args.timeout)
+        sys.exit(capture.main(args.serials, output_dir, args.raw))
+    except KeyboardInterrupt:
+        print(f"\n{Colors.PRIMARY}✨ Terima kasih! ✨{Colors.RESET}")